@@ -1,32 +1,116 @@
+import json
 import logging
+import os
+import time
 import allure
 import configparser
+from contextlib import contextmanager
+from allure_commons.types import AttachmentType
 from playwright.sync_api import Page, expect
+from base.navigation import NavigationGraph
+from utils.adaptive_timeout import LatencyHistory
+from utils.perf_budget import BudgetExceeded, PerfRecorder
 
 class BasePage:
     """Base class for all page objects with common methods"""
 
+    # Page URL, for pages that can be opened directly
+    URL = None
+
+    # Pages reachable from this page: {"PageClassName": "method_name"}
+    TRANSITIONS = {}
+
+    # Performance budgets per measured action: {"navigate": {"lcp": 2500}, "find_leads": {"duration": 3000}}
+    BUDGETS = {}
+
+    # Configured browser name of the running test (chrome, msedge, firefox, ...), set by the page fixture
+    browser_name = None
+
     def __init__(self, page: Page):
         self.page = page
         self.logger = logging.getLogger(__name__)
         self.timeout = self._read_timeout()
         self.page.set_default_timeout(self.timeout)
+        if PerfRecorder.active:
+            PerfRecorder.active.install(page)
 
     def _read_timeout(self) -> int:
         config = configparser.ConfigParser()
         config.read("config.properties")
         return int(config.get("default", "action.timeout", fallback="60000"))
 
+    @contextmanager
+    def _adaptive_timeout(self, selector: str, timeout: int = None):
+        """
+        Yield the timeout of an action on a selector and record its latency once it succeeds
+
+        Without adaptive timeouts (or an explicit timeout) this is action.timeout.
+        """
+        history = LatencyHistory.active
+        page_class = type(self).__name__
+        if timeout is None:
+            timeout = history.timeout_for(page_class, selector, self.timeout) if history else self.timeout
+        start = time.perf_counter()
+        try:
+            yield timeout
+        except Exception:
+            if history and timeout < self.timeout:
+                self.logger.error(f"Action on {selector} failed within its adaptive timeout of {timeout}ms (ceiling {self.timeout}ms)")
+            raise
+        if history:
+            history.record(page_class, selector, (time.perf_counter() - start) * 1000)
+
+    @contextmanager
+    def measure(self, action: str):
+        """
+        Measure an action with the performance budgets on and check it against its budgets
+
+        Records the wall time as "duration", plus the resources, long tasks and layout
+        shifts of the action, and the Navigation Timing and LCP of any document it loaded.
+        Budgets come from the class' BUDGETS, overridden by the test's perf_budget markers.
+        """
+        recorder = PerfRecorder.active
+        if recorder is None:
+            yield
+            return
+        mark = recorder.mark(self.page)
+        start = time.perf_counter()
+        yield
+        metrics = {"duration": (time.perf_counter() - start) * 1000, **recorder.collect(self.page, mark)}
+
+        key = f"{type(self).__name__}.{action}"
+        budgets = {**self.BUDGETS.get(action, {}), **recorder.test_budgets.get(key, {})}
+        exceeded = recorder.check(key, metrics, budgets)
+        if not exceeded:
+            return
+        allure.attach(json.dumps(metrics, indent=2), name=f"{key} metrics", attachment_type=AttachmentType.JSON)
+        message = f"Performance budget exceeded: {'; '.join(exceeded)}"
+        if recorder.mode == "fail":
+            raise BudgetExceeded(message)
+        self.logger.warning(message)
+
     def navigate(self, url: str):
         with allure.step(f"Navigate to URL: {url}"):
             self.logger.info(f"Navigating to: {url}")
-            self.page.goto(url)
+            with self.measure("navigate"):
+                self.page.goto(url)
+
+    def navigate_to(self, target, click_through: bool = False):
+        """
+        Navigate from this page to another page object along the shortest path
+
+        Jumps straight to the target's URL once the browser is inside the target's
+        web application; pass click_through=True to follow every transition instead.
+        """
+        with allure.step(f"Navigate from {type(self).__name__} to {target.__name__}"):
+            return NavigationGraph.default().navigate(self.page, type(self), target, click_through)
 
     def click(self, selector: str):
         with allure.step(f"Click on element: {selector}"):
             self.logger.info(f"Clicking element: {selector}")
             try:
-                self.page.click(selector)
+                with self._adaptive_timeout(selector) as timeout:
+                    self.page.click(selector, timeout=timeout)
             except Exception as e:
                 self.logger.error(f"Failed to click element {selector}: {str(e)}")
                 raise
@@ -35,7 +119,8 @@ class BasePage:
         with allure.step(f"Fill text '{text}' into: {selector}"):
             self.logger.info(f"Filling text in element {selector}: {text}")
             try:
-                self.page.fill(selector, text)
+                with self._adaptive_timeout(selector) as timeout:
+                    self.page.fill(selector, text, timeout=timeout)
             except Exception as e:
                 self.logger.error(f"Failed to fill text in element {selector}: {str(e)}")
                 raise
@@ -43,7 +128,8 @@ class BasePage:
     def get_text(self, selector: str) -> str:
         with allure.step(f"Get text from element: {selector}"):
             try:
-                text = self.page.text_content(selector)
+                with self._adaptive_timeout(selector) as timeout:
+                    text = self.page.text_content(selector, timeout=timeout)
                 self.logger.info(f"Got text from element {selector}: {text}")
                 return text
             except Exception as e:
@@ -54,7 +140,8 @@ class BasePage:
         with allure.step(f"Select option '{option}' from dropdown: {selector}"):
             self.logger.info(f"Selecting option {option} from dropdown {selector}")
             try:
-                self.page.select_option(selector, option)
+                with self._adaptive_timeout(selector) as timeout:
+                    self.page.select_option(selector, option, timeout=timeout)
             except Exception as e:
                 self.logger.error(f"Failed to select option {option} from dropdown {selector}: {str(e)}")
                 raise
@@ -71,8 +158,8 @@ class BasePage:
                 return False
 
     def wait_for_element(self, selector: str, timeout: int = None):
-        final_timeout = timeout if timeout is not None else self.timeout
-        with allure.step(f"Wait for element {selector} (timeout={final_timeout}ms)"):
+        with self._adaptive_timeout(selector, timeout) as final_timeout, \
+                allure.step(f"Wait for element {selector} (timeout={final_timeout}ms)"):
             self.logger.info(f"Waiting for element: {selector}")
             try:
                 self.page.wait_for_selector(selector, timeout=final_timeout)
@@ -89,3 +176,102 @@ class BasePage:
         with allure.step(f"Assert element {selector} contains text: '{expected_text}'"):
             self.logger.info(f"Asserting element {selector} contains text: {expected_text}")
             expect(self.page.locator(selector)).to_contain_text(expected_text)
+
+    def _read_snapshot_settings(self) -> dict:
+        config = configparser.ConfigParser()
+        config.read("config.properties")
+        update = os.environ.get("SNAPSHOT_UPDATE") or config.get("default", "snapshot.update", fallback="false")
+        return {
+            "dir": config.get("default", "snapshot.dir", fallback="snapshots"),
+            "diff_dir": config.get("default", "snapshot.diff_dir", fallback="snapshot-diffs"),
+            "threshold": config.getfloat("default", "snapshot.threshold", fallback=0.1),
+            "max_diff_ratio": config.getfloat("default", "snapshot.max_diff_ratio", fallback=0.001),
+            "max_hash_distance": config.getint("default", "snapshot.hash_distance", fallback=10),
+            "update": update.lower() == "true",
+        }
+
+    def _mask_regions(self, selector: str, mask: list, width: int) -> list:
+        """Bounding boxes of the masked elements in screenshot pixels"""
+        if not mask:
+            return []
+        if selector:
+            origin = self.page.locator(selector).bounding_box()
+            if origin is None:
+                raise AssertionError(f"Snapshot element {selector} is hidden or detached")
+            css_width = origin["width"]
+        else:
+            # Maximized chrome, msedge and firefox run without a fixed viewport
+            origin = {"x": 0, "y": 0}
+            css_width = self.page.evaluate("document.documentElement.clientWidth")
+        scale = width / css_width if css_width else 1
+        regions = []
+        for mask_selector in mask:
+            for element in self.page.locator(mask_selector).all():
+                box = element.bounding_box()
+                if box:
+                    regions.append((
+                        (box["x"] - origin["x"]) * scale, (box["y"] - origin["y"]) * scale,
+                        box["width"] * scale, box["height"] * scale,
+                    ))
+        return regions
+
+    def assert_matches_snapshot(self, name: str, selector: str = None, mask: list = None):
+        """
+        Compare a screenshot of the page, or of one element, with its stored baseline
+
+        A missing baseline is written from the current capture. On a mismatch the
+        capture and a diff image are written to snapshot.diff_dir and attached to Allure.
+
+        Args:
+            name: Snapshot name, unique within the page object
+            selector: Element to capture instead of the viewport
+            mask: Selectors of dynamic regions (dates, counters) to ignore
+        """
+        # NumPy and Pillow are only loaded by tests comparing snapshots
+        from utils import visual_diff
+
+        with allure.step(f"Assert snapshot '{name}' matches" + (f" for: {selector}" if selector else "")):
+            settings = self._read_snapshot_settings()
+            # chrome, msedge and chromium share a browser type but render differently
+            browser = self.page.context.browser
+            browser_name = BasePage.browser_name or (browser.browser_type.name if browser else "browser")
+            file_name = f"{name}-{browser_name}.png"
+            baseline_path = os.path.join(settings["dir"], type(self).__name__, file_name)
+
+            target = self.page.locator(selector) if selector else self.page
+            capture = target.screenshot(animations="disabled", caret="hide")
+            if settings["update"] or not os.path.exists(baseline_path):
+                os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+                with open(baseline_path, "wb") as file:
+                    file.write(capture)
+                self.logger.warning(f"Wrote snapshot baseline: {baseline_path}")
+                return
+
+            with open(baseline_path, "rb") as file:
+                expected = visual_diff.decode_png(file.read())
+            actual = visual_diff.decode_png(capture)
+            result = visual_diff.compare_images(
+                expected, actual,
+                regions=self._mask_regions(selector, mask, actual.shape[1]),
+                threshold=settings["threshold"],
+                max_diff_ratio=settings["max_diff_ratio"],
+                max_hash_distance=settings["max_hash_distance"],
+            )
+            if result["match"]:
+                self.logger.info(f"Snapshot {baseline_path} matches ({result['diff_pixels']} pixels differ)")
+                return
+
+            diff_dir = os.path.join(settings["diff_dir"], type(self).__name__)
+            os.makedirs(diff_dir, exist_ok=True)
+            stem = os.path.splitext(file_name)[0]
+            actual_path = os.path.join(diff_dir, f"{stem}-actual.png")
+            with open(actual_path, "wb") as file:
+                file.write(capture)
+            allure.attach.file(actual_path, name=f"{name} actual", attachment_type=AttachmentType.PNG)
+            if result["diff_image"] is not None:
+                diff_path = os.path.join(diff_dir, f"{stem}-diff.png")
+                with open(diff_path, "wb") as file:
+                    file.write(visual_diff.encode_png(result["diff_image"]))
+                allure.attach.file(diff_path, name=f"{name} diff", attachment_type=AttachmentType.PNG)
+            self.logger.error(f"Snapshot {baseline_path} does not match: {result['reason']}")
+            raise AssertionError(f"Snapshot '{name}' does not match {baseline_path}: {result['reason']}")
@@ -0,0 +1,129 @@
+"""
+Navigation module building a graph of page objects from their URLs and transitions
+"""
+import importlib
+import logging
+import pkgutil
+from collections import deque
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+def load_page_classes():
+    """
+    Import every module of the pages package and collect its page object classes
+
+    Returns:
+        dict: {"ClassName": page object class}
+    """
+    import pages
+    from base.base_page import BasePage
+
+    page_classes = {}
+    for module_info in pkgutil.iter_modules(pages.__path__):
+        module = importlib.import_module(f"pages.{module_info.name}")
+        for name, value in vars(module).items():
+            if isinstance(value, type) and issubclass(value, BasePage) and value.__module__ == module.__name__:
+                page_classes[name] = value
+    return page_classes
+
+
+def app_of(url):
+    """Get the web application a URL belongs to, e.g. "crmsfa" for /crmsfa/control/main"""
+    segments = urlsplit(url).path.split("/")
+    return segments[1] if len(segments) > 1 else ""
+
+
+class NavigationGraph:
+    """Graph of page objects whose edges are the click methods declared in TRANSITIONS"""
+
+    _default = None
+
+    def __init__(self, page_classes):
+        """
+        Args:
+            page_classes: {"ClassName": page object class}
+        """
+        self.page_classes = page_classes
+
+    @classmethod
+    def default(cls):
+        """Get the graph of all page objects in the pages package"""
+        if cls._default is None:
+            cls._default = cls(load_page_classes())
+        return cls._default
+
+    def shortest_path(self, source, target):
+        """
+        Find the shortest chain of transitions between two page objects
+
+        Args:
+            source: Page object class to start from
+            target: Page object class to reach
+
+        Returns:
+            list[tuple]: (page class, method name, next page class) per step, or None if unreachable
+        """
+        previous = {source: None}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            if current is target:
+                break
+            for name, method in current.TRANSITIONS.items():
+                next_class = self.page_classes.get(name)
+                if next_class is not None and next_class not in previous:
+                    previous[next_class] = (current, method)
+                    queue.append(next_class)
+        if target not in previous:
+            return None
+
+        path = []
+        node = target
+        while previous[node] is not None:
+            current, method = previous[node]
+            path.append((current, method, node))
+            node = current
+        return list(reversed(path))
+
+    def can_jump(self, page, target):
+        """
+        Check if the target can be opened by URL: it declares one and the browser
+        is already inside the target's (authenticated) web application
+        """
+        return bool(target.URL) and app_of(page.url) == app_of(target.URL)
+
+    def navigate(self, page, source, target, click_through=False):
+        """
+        Move the browser from the source page object to the target page object
+
+        Args:
+            page: Playwright page
+            source: Page object class the browser is on
+            target: Page object class to reach
+            click_through: Follow every transition instead of jumping to the target URL
+
+        Returns:
+            BasePage: Instance of the target page object
+        """
+        if source is target:
+            return target(page)
+
+        path = self.shortest_path(source, target) or []
+        for current, method, next_class in path:
+            if not click_through and self.can_jump(page, target):
+                return self._jump(page, target)
+            logger.info(f"Navigating {current.__name__} -> {next_class.__name__} via {method}")
+            getattr(current(page), method)()
+        if path:
+            return target(page)
+
+        if not click_through and self.can_jump(page, target):
+            return self._jump(page, target)
+        raise ValueError(f"No navigation path from {source.__name__} to {target.__name__}")
+
+    def _jump(self, page, target):
+        target_page = target(page)
+        target_page.navigate(target.URL)
+        return target_page
@@ -2,7 +2,13 @@
 Pytest configuration file with Playwright fixtures, Allure & HTML reporting
 """
 
+import time
+from contextlib import nullcontext
+
+_CONFTEST_START = time.perf_counter()
+
 import configparser
+import logging
 import os
 import pytest
 import allure
@@ -11,23 +17,259 @@ from datetime import datetime
 from playwright.sync_api import sync_playwright
 import pytest_html
 from utils.logger import setup_logger
+from utils.adaptive_timeout import LatencyHistory
+from utils.asset_cache import DEFAULT_PATTERN, AssetCache
+from utils.attachment_store import AttachmentStore, install_store_logger
+from utils.collect_profile import CollectProfiler
+from utils.data_helper import DataHelper
+from utils.dev_daemon import load_storage_state, read_state, save_storage_state
+from utils.browser_factory import get_launch_settings, resolve_launch_settings
+from utils.browser_pool import RemoteBrowserPool, read_endpoints
+from utils.browser_server import BrowserPrelauncher
+from utils.lead_pool import LeadPool
+from utils.perf_budget import PerfRecorder
+from utils.resource_monitor import ResourceMonitor
+from utils.run_metrics import RunMetrics
+from utils.sharding import TestDurations, assign_shards, parse_shard
+from utils.retry_helper import FlakyHistory, retries_supported, run_with_retries
+from utils.startup_timer import StartupTimer
+from utils.streaming_report import ARTIFACT_PREFIX, StreamingReport
 from data.test_fixture import test_data
+from data.user_credentials import valid_user
+from base.base_page import BasePage
+from pages.login_page import LoginPage
+from pages.home_page import HomePage
 
-logger = setup_logger()
+startup_timer = StartupTimer(_CONFTEST_START)
+startup_timer.record("imports", time.perf_counter() - _CONFTEST_START)
+
+# Configured in pytest_configure
+logger = logging.getLogger()
 
 def pytest_addoption(parser):
     """Add custom command line options for pytest"""
     parser.addoption("--mybrowser", action="store", default="chromium", help="Browser to run tests on")
     parser.addoption("--headless", action="store", default="false", help="Run tests in headless mode")
     parser.addoption("--slow_mo", action="store", default=0, type=int, help="Delay between operations in ms")
+    parser.addoption("--retries", action="store", default=None, type=int, help="Retries for failed tests (default: retry.count)")
+    parser.addoption("--retry_backoff", action="store", default=None, type=float, help="Base delay in seconds between retries (default: retry.backoff)")
+    parser.addoption("--prelaunch", action="store", default=None, help="Launch the browser in the background during collection (default: browser.prelaunch)")
+    parser.addoption("--browsers", action="store", default=None, help="Comma separated browsers to run every test on, e.g. chromium,firefox,webkit")
+    parser.addoption("--shard", action="store", default=None, help="Run one shard of the suite split by historical duration, e.g. 2/4")
+    parser.addoption("--dev_daemon", action="store", default=None, help="Use the warm browser and login of a running dev daemon: auto or false (default: daemon.use)")
+    parser.addoption("--browser_servers", action="store", default=None, help="Comma separated ws endpoints of browser servers, or a file listing them (default: browser.servers)")
+    parser.addoption("--asset_cache", action="store", default=None, help="Serve static assets from a cache shared by the worker's contexts (default: asset_cache.enabled)")
+    parser.addoption("--report_dir", action="store", default=None, help="Directory of the streaming HTML report (default: report.dir)")
+    parser.addoption("--metrics_dir", action="store", default=None, help="Directory of the OpenMetrics/JSON run metrics, empty to disable (default: metrics.dir)")
+    parser.addoption("--allure_store", action="store", default=None, help="Content-addressed store for Allure attachments, empty to copy them (default: allure.store)")
+    parser.addoption("--adaptive_timeouts", action="store", default=None, help="Derive action timeouts from the latencies of previous runs (default: timeout.adaptive)")
+    parser.addoption("--perf_budgets", action="store", default=None, help="Measure page actions against their performance budgets: off, warn or fail (default: perf.budgets)")
+    parser.addoption("--update_snapshots", action="store_true", default=False, help="Overwrite the visual snapshot baselines with the new captures")
+    parser.addoption("--collect-profile", "--collect_profile", action="store_true", default=False, help="Report the import and collection time of every test module")
+    parser.addoption("--monitor_resources", action="store", default=None, help="Sample browser CPU/RSS per test and flag leaks (default: monitor.resources)")
 
-@pytest.fixture(scope="session")
-def browser_type_launch_args(pytestconfig):
+def _option_or_property(config, properties, option, key, fallback):
+    """Command line option value, falling back to config.properties"""
+    value = config.getoption(option)
+    return value if value is not None else properties.get("default", key, fallback=fallback)
+
+def pytest_configure(config):
+    """Read run settings from the command line and config.properties"""
+    setup_logger()
+    properties = configparser.ConfigParser()
+    properties.read("config.properties")
+
+    config.addinivalue_line("markers", "csv_data(argname, path): parametrize argname with the rows of a CSV file, read when the test is collected")
+    if config.getoption("--collect-profile"):
+        config.pluginmanager.register(CollectProfiler(startup_timer.phases.get("imports")), "collect_profiler")
+
+    retries = config.getoption("--retries")
+    backoff = config.getoption("--retry_backoff")
+    config.retry_count = retries if retries is not None else properties.getint("default", "retry.count", fallback=0)
+    config.retry_backoff = backoff if backoff is not None else properties.getfloat("default", "retry.backoff", fallback=1.0)
+    if config.retry_count and not retries_supported():
+        raise pytest.UsageError(
+            f"Retries run the test phases through pytest internals that pytest {pytest.__version__} does not provide; "
+            "run with --retries=0 or the pytest version pinned in requirements.txt"
+        )
+    config.flaky_history = FlakyHistory(properties.get("default", "retry.history", fallback=".flaky_history.json"))
+    config.flaky_outcomes = {}
+
+    prelaunch = _option_or_property(config, properties, "--prelaunch", "browser.prelaunch", "false")
+    config.prelaunch_browser = prelaunch.lower() == "true"
+    config.browser_prelaunchers = {}
+
+    monitor_resources = _option_or_property(config, properties, "--monitor_resources", "monitor.resources", "false")
+    config.resource_monitor = None
+    if monitor_resources.lower() == "true":
+        if ResourceMonitor.is_supported():
+            config.resource_monitor = ResourceMonitor(
+                interval=properties.getfloat("default", "monitor.interval", fallback=0.25),
+                leak_threshold_mb=properties.getint("default", "monitor.leak_threshold_mb", fallback=50),
+            )
+            config.resource_report = properties.get("default", "monitor.report", fallback="resource-report.json")
+        else:
+            logger.warning("Resource monitoring needs /proc and is disabled on this platform")
+
+    report_dir = _option_or_property(config, properties, "--report_dir", "report.dir", "")
+    if report_dir:
+        page_size = properties.getint("default", "report.page_size", fallback=200)
+        config.pluginmanager.register(StreamingReport(report_dir, page_size), "streaming_report")
+
+    metrics_dir = _option_or_property(config, properties, "--metrics_dir", "metrics.dir", "")
+    config.run_metrics = None
+    if metrics_dir:
+        config.run_metrics = RunMetrics(
+            metrics_dir,
+            stream=properties.getboolean("default", "metrics.stream", fallback=False),
+            startup_phases=startup_timer.phases,
+        )
+        config.pluginmanager.register(config.run_metrics, "run_metrics")
+
+    store_dir = _option_or_property(config, properties, "--allure_store", "allure.store", "")
+    config.attachment_store = None
+    if store_dir and config.getoption("allure_report_dir", default=None):
+        config.attachment_store = AttachmentStore(
+            store_dir,
+            compress_text=properties.getboolean("default", "allure.store.compress_text", fallback=True),
+            max_age_days=properties.getint("default", "allure.store.max_age_days", fallback=14),
+            max_size_mb=properties.getint("default", "allure.store.max_size_mb", fallback=2048),
+        )
+    config.allure_results_dir = None
+    config.lead_pool = None
+
+    adaptive_timeouts = _option_or_property(config, properties, "--adaptive_timeouts", "timeout.adaptive", "false")
+    if adaptive_timeouts.lower() == "true":
+        # Page objects pick the active history up when they run an action
+        LatencyHistory.active = LatencyHistory(
+            properties.get("default", "timeout.history", fallback=".latency_history.json"),
+            multiplier=properties.getfloat("default", "timeout.multiplier", fallback=3.0),
+            floor_ms=properties.getint("default", "timeout.floor_ms", fallback=2000),
+            min_samples=properties.getint("default", "timeout.min_samples", fallback=20),
+        )
+
+    config.addinivalue_line("markers", "perf_budget(key, **limits): performance budgets of a page action, e.g. perf_budget(\"FindLeadsPage.find_leads\", duration=2000)")
+    perf_budgets = _option_or_property(config, properties, "--perf_budgets", "perf.budgets", "off").lower()
+    if perf_budgets in ("warn", "fail"):
+        PerfRecorder.active = PerfRecorder(properties.get("default", "perf.history", fallback=".perf_history.json"), mode=perf_budgets)
+
+    if config.getoption("--update_snapshots"):
+        # Page objects read the snapshot settings themselves, outside of pytest
+        os.environ["SNAPSHOT_UPDATE"] = "true"
+
+    config.test_durations = TestDurations(properties.get("default", "shard.durations", fallback=".test_durations.json"))
+    config.pluginmanager.register(config.test_durations, "test_durations")
+    try:
+        config.shard = parse_shard(config.getoption("--shard")) if config.getoption("--shard") else None
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+
+    config.browser_servers = read_endpoints(_option_or_property(config, properties, "--browser_servers", "browser.servers", ""))
+
+    asset_cache = _option_or_property(config, properties, "--asset_cache", "asset_cache.enabled", "false")
+    config.asset_cache = None
+    if asset_cache.lower() == "true":
+        config.asset_cache = AssetCache(
+            max_mb=properties.getint("default", "asset_cache.max_mb", fallback=64),
+            pattern=properties.get("default", "asset_cache.pattern", fallback=DEFAULT_PATTERN),
+            default_ttl=properties.getint("default", "asset_cache.default_ttl", fallback=300),
+        )
+
+    browsers = config.getoption("--browsers")
+    config.browser_matrix = [name.strip().lower() for name in browsers.split(",") if name.strip()] if browsers else []
+    if config.browser_matrix:
+        # pytest-playwright parametrizes browser_name from its --browser option
+        config.option.browser = config.browser_matrix
+
+    # The browser matrix and browser servers bring browsers of their own
+    config.dev_daemon = None
+    use_daemon = _option_or_property(config, properties, "--dev_daemon", "daemon.use", "auto")
+    if use_daemon.lower() != "false" and not config.browser_matrix and not config.browser_servers:
+        config.dev_daemon = read_state(properties.get("default", "daemon.dir", fallback=".dev-daemon"))
+        if config.dev_daemon:
+            logger.info(f"Using the dev daemon's {config.dev_daemon['browser']} browser at {config.dev_daemon['ws_endpoint']}")
+
+def pytest_sessionstart(session):
+    """Route Allure attachments through the store and start launching the browsers in the background"""
+    config = session.config
+    config.session_start_time = time.time()
+    if config.attachment_store:
+        # allure-pytest registers its file logger in its own pytest_configure
+        installed = install_store_logger(config.attachment_store)
+        if installed:
+            config.allure_results_dir, restore = installed
+            config.add_cleanup(restore)
+
+    if config.browser_servers:
+        # The tests' contexts are opened in the pool's browsers, a local one would never be used
+        return
+    if config.option.collectonly:
+        # No test runs, a launched browser would only be shut down again
+        return
+    if config.browser_matrix:
+        # Every lane of the matrix launches concurrently
+        names = config.browser_matrix
+    elif config.prelaunch_browser and not config.dev_daemon:
+        properties = configparser.ConfigParser()
+        properties.read("config.properties")
+        names = [properties.get("default", "browser", fallback=config.getoption("--mybrowser")).lower()]
+    else:
+        return
+
+    for name in names:
+        browser_type_name, launch_args, _ = resolve_launch_settings(name, _base_launch_args(config), {})
+        prelauncher = BrowserPrelauncher(name, browser_type_name, launch_args)
+        prelauncher.start()
+        config.browser_prelaunchers[name] = prelauncher
+        logger.info(f"Pre-launching {name} browser in the background")
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection(session):
+    startup_timer.start("collection")
+
+@pytest.hookimpl(trylast=True)
+def pytest_generate_tests(metafunc):
+    """Parametrize tests from the CSV file of their csv_data marker, after the browser like the parametrize marker"""
+    for marker in metafunc.definition.iter_markers("csv_data"):
+        argname, path = marker.args
+        metafunc.parametrize(argname, DataHelper.read_csv_rows(path))
+
+def pytest_collection_modifyitems(config, items):
+    """Keep the tests of this node's shard, the split is the same on every node"""
+    if not config.shard:
+        return
+    index, count = config.shard
+    assignment, loads = assign_shards([item.nodeid for item in items], config.test_durations.durations(), count)
+    selected = [item for item in items if assignment[item.nodeid] == index - 1]
+    deselected = [item for item in items if assignment[item.nodeid] != index - 1]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = selected
+    logger.info(f"Shard {index}/{count}: {len(selected)} of {len(selected) + len(deselected)} tests, ~{loads[index - 1]:.0f}s of {sum(loads):.0f}s")
+
+def pytest_collection_finish(session):
+    startup_timer.stop("collection")
+
+def _base_launch_args(config):
     return {
-        "headless": pytestconfig.getoption("--headless").lower() == "true",
-        "slow_mo": pytestconfig.getoption("--slow_mo")
+        "headless": config.getoption("--headless").lower() == "true",
+        "slow_mo": config.getoption("--slow_mo")
     }
 
+def _phase(request, name):
+    """Time a block as a phase of the current test when run metrics are on"""
+    if request.config.run_metrics is None:
+        return nullcontext()
+    return request.config.run_metrics.phase(request.node.nodeid, name)
+
+def _record_artifact(request, kind, path):
+    if request.config.run_metrics:
+        request.config.run_metrics.record_artifact(kind, path)
+
+@pytest.fixture(scope="session")
+def browser_type_launch_args(pytestconfig):
+    return _base_launch_args(pytestconfig)
+
 @pytest.fixture(scope="session")
 def browser_name(pytestconfig):
     return pytestconfig.getoption("--mybrowser").lower()
@@ -42,152 +284,328 @@ def browser_context_args():
         "viewport": {"width": 1920, "height": 1080},
     }
 
+@pytest.fixture(scope="session")
+def playwright():
+    """Start one Playwright driver for the whole session"""
+    startup_timer.start("driver start")
+    playwright = sync_playwright().start()
+    startup_timer.stop("driver start")
+    yield playwright
+    playwright.stop()
+
+@pytest.fixture(scope="session")
+def browser_settings(pytestconfig, playwright, browser_type_launch_args, browser_context_args, browser_name):
+    """Resolve browser type, launch args and context args for the configured browser"""
+    config = configparser.ConfigParser()
+    config.read("config.properties")
+
+    if pytestconfig.browser_matrix:
+        config_browser_name = browser_name.lower()
+    else:
+        config_browser_name = config.get("default", "browser", fallback=browser_name).lower()
+    browser_type, launch_args, context_args = get_launch_settings(
+        playwright, config_browser_name, browser_type_launch_args, browser_context_args
+    )
+    return {
+        "name": config_browser_name,
+        "browser_type": browser_type,
+        "launch_args": launch_args,
+        "context_args": context_args,
+    }
+
+@pytest.fixture(scope="session")
+def browser(pytestconfig, browser_settings):
+    """Launch the browser once and share it between tests and their retries"""
+    browser_type = browser_settings["browser_type"]
+    launch_args = browser_settings["launch_args"]
+    name = browser_settings["name"]
+    prelauncher = pytestconfig.browser_prelaunchers.get(name)
+    daemon = pytestconfig.dev_daemon
+    browser = None
+
+    # The daemon's browser is only used when it was launched like this run's would be
+    if daemon and (daemon["browser"], daemon.get("headless")) != (name, launch_args.get("headless", False)):
+        logger.info(
+            f"Dev daemon runs {daemon['browser']} (headless={daemon.get('headless')}), "
+            f"this run asks for {name} (headless={launch_args.get('headless', False)}): launching locally"
+        )
+        daemon = None
+
+    if daemon and not prelauncher:
+        startup_timer.start(f"{name} browser connect (dev daemon)")
+        try:
+            browser = browser_type.connect(daemon["ws_endpoint"], slow_mo=launch_args.get("slow_mo"))
+            browser_settings["external"] = True
+            logger.info(f"Connected to the dev daemon's {name} browser")
+        except Exception as e:
+            logger.error(f"Failed to connect to the dev daemon: {e}")
+        startup_timer.stop(f"{name} browser connect (dev daemon)")
+    elif prelauncher:
+        startup_timer.start(f"{name} browser ready (waited)")
+        ws_endpoint = prelauncher.wait(timeout=120)
+        if ws_endpoint:
+            try:
+                browser = browser_type.connect(ws_endpoint, slow_mo=launch_args.get("slow_mo"))
+                startup_timer.record(f"{name} browser launch (background)", prelauncher.launch_time)
+                logger.info(f"Connected to pre-launched {name} browser")
+            except Exception as e:
+                logger.error(f"Failed to connect to pre-launched browser: {e}")
+        startup_timer.stop(f"{name} browser ready (waited)")
+
+    # Contexts of a connected browser keep their videos on the server side
+    browser_settings["remote"] = browser is not None
+    if browser is None:
+        startup_timer.start(f"{name} browser launch")
+        browser = browser_type.launch(**launch_args)
+        startup_timer.stop(f"{name} browser launch")
+        logger.info(f"Launched {name} browser")
+
+    yield browser
+    try:
+        # Closing a connected browser only disconnects, the server closes the contexts of this run
+        browser.close()
+    except Exception as e:
+        logger.error(f"Failed to close browser: {e}")
+
+@pytest.fixture(scope="session")
+def browser_pool(pytestconfig, browser_settings):
+    """Pool of remote browser servers the tests' contexts are spread over, None without --browser_servers"""
+    if not pytestconfig.browser_servers:
+        yield None
+        return
+    config = configparser.ConfigParser()
+    config.read("config.properties")
+
+    pool = RemoteBrowserPool(
+        browser_settings["browser_type"],
+        pytestconfig.browser_servers,
+        browser_settings["launch_args"],
+        retry_interval=config.getint("default", "browser.servers.retry_interval", fallback=30),
+    )
+    logger.info(f"Spreading tests over {len(pytestconfig.browser_servers)} browser servers")
+    yield pool
+    logger.info(f"Browser pool: {pool.stats}")
+    pool.close()
+
+@pytest.fixture(scope="session")
+def auth_state_cache():
+    """Storage state of successful logins keyed by username"""
+    return {}
+
+@pytest.fixture(scope="function")
+def authenticated_page(request, page, test_data, auth_state_cache):
+    """Fixture to perform login and return authenticated page"""
+    login_page = LoginPage(page)
+    home_page = HomePage(page)
+    user = test_data["valid_user"]
+
+    with _phase(request, "login"):
+        # Retries reuse the cookies of the first successful login instead of the UI login
+        cached_state = auth_state_cache.get(user["username"])
+        daemon = request.config.dev_daemon
+        if daemon and daemon["user"] == user["username"]:
+            # Against the dev daemon every test starts from the login it keeps
+            cached_state = cached_state or load_storage_state(daemon)
+            reuse = cached_state is not None
+        else:
+            reuse = getattr(request.node, "execution_count", 1) > 1 and cached_state
+        if reuse:
+            page.context.add_cookies(cached_state["cookies"])
+            home_page.navigate_to_home()
+            if home_page.is_logged_in():
+                logger.info(f"Reusing cached login for {user['username']}")
+                home_page.click_crm_sfa_link()
+                return page
+
+        login_page.navigate_to_login()
+        login_page.perform_login(user["username"], user["password"])
+        auth_state_cache[user["username"]] = page.context.storage_state()
+        if daemon and daemon["user"] == user["username"]:
+            save_storage_state(daemon, page.context)
+
+        home_page.click_crm_sfa_link()
+    return page
+
+@pytest.fixture(scope="session")
+def lead_pool(request, pytestconfig, browser_settings, browser_pool):
+    """Leads created once per session (per worker with xdist) and shared between tests"""
+    config = configparser.ConfigParser()
+    config.read("config.properties")
+
+    member = browser_pool.acquire() if browser_pool else None
+    browser = member.browser if member else request.getfixturevalue("browser")
+    # The pool's own context does not record videos
+    context_args = {key: value for key, value in browser_settings["context_args"].items() if key != "record_video_dir"}
+    pool = LeadPool(
+        lambda: browser.new_context(**context_args),
+        valid_user,
+        size=config.getint("default", "lead_pool.size", fallback=1),
+    )
+    pytestconfig.lead_pool = pool
+    yield pool
+    pool.close()
+
+@pytest.fixture(scope="function")
+def pooled_lead(lead_pool):
+    """Lead for tests that only read it, returned to the pool afterwards"""
+    lead = lead_pool.checkout()
+    yield lead
+    lead_pool.release(lead)
+
+@pytest.fixture(scope="function")
+def exclusive_lead(lead_pool):
+    """Lead for tests that modify it, never handed to another test"""
+    lead = lead_pool.checkout(exclusive=True)
+    yield lead
+    lead_pool.release(lead)
+
 @pytest.fixture(scope="function")
-def page(request, browser_type_launch_args, browser_context_args, browser_name):
+def page(request, browser_settings, browser_pool):
     config = configparser.ConfigParser()
     config.read("config.properties")
 
-    config_browser_name = config.get("default", "browser", fallback=browser_name).lower()
+    # With browser servers every test takes the next one in turn, otherwise the session browser
+    with _phase(request, "browser_launch"):
+        member = browser_pool.acquire() if browser_pool else None
+        browser = member.browser if member else request.getfixturevalue("browser")
+    remote = member.remote if member else browser_settings.get("remote")
+    # Browsers of other processes than pytest's, unlike the pre-launched server
+    external = member.remote if member else browser_settings.get("external")
+
+    config_browser_name = browser_settings["name"]
+    BasePage.browser_name = config_browser_name
+    context_args = browser_settings["context_args"]
     trace_dir = config.get("default", "trace.dir", fallback="traces")
     test_timeout = config.getint("default", "test.timeout", fallback=90000)
     
     os.makedirs(trace_dir, exist_ok=True)
 
-    with sync_playwright() as playwright:
-        # Setup launch args and context args based on browser_name
-        if config_browser_name == "chrome":
-            browser_type = playwright.chromium
-            launch_args = {
-                "channel": "chrome",
-                **browser_type_launch_args,
-                "args": [
-                    "--start-maximized"
-                ],
-            }
-            context_args = browser_context_args.copy()
-            context_args["viewport"] = None 
-
-        elif config_browser_name == "msedge":
-            browser_type = playwright.chromium
-            launch_args = {
-                "channel": "msedge",
-                **browser_type_launch_args,
-                "args": [
-                    "--start-maximized",
-                    "--window-size=1920,1080",
-                    "--disable-web-security",
-                    "--no-proxy-server"
-                ],
-            }
-            context_args = browser_context_args.copy()
-            context_args["viewport"] = None 
-
-        elif config_browser_name == "firefox":
-            browser_type = playwright.firefox
-            launch_args = {
-                **browser_type_launch_args,
-                "args": ["--kiosk"],
-            }
-            context_args = browser_context_args.copy()
-            context_args["viewport"] = None
-
-        elif config_browser_name == "webkit":
-            browser_type = playwright.webkit
-            launch_args = browser_type_launch_args
-            context_args = browser_context_args.copy()
-            context_args["viewport"] = {"width": 1280, "height": 680}
+    monitor = request.config.resource_monitor
+    if monitor and external:
+        monitor.skip_test(request.node.nodeid)
+    elif monitor:
+        monitor.start_test(request.node.nodeid, browser)
+        # Also stops the sampler when the setup below fails
+        request.addfinalizer(lambda: monitor.finish_test(browser))
 
-        else:
-            # default chromium launch
-            browser_type = playwright.chromium
-            launch_args = browser_type_launch_args
-            context_args = browser_context_args.copy()
+    if PerfRecorder.active:
+        # Markers closest to the test win
+        PerfRecorder.active.test_budgets = {}
+        for marker in reversed(list(request.node.iter_markers("perf_budget"))):
+            PerfRecorder.active.test_budgets.setdefault(marker.args[0], {}).update(marker.kwargs)
 
-        browser = browser_type.launch(**launch_args)
+    with _phase(request, "context_create"):
         context = browser.new_context(**context_args)
+        if request.config.asset_cache:
+            request.config.asset_cache.attach(context)
         page = context.new_page()
         page.set_default_timeout(test_timeout)
+        startup_timer.mark("first page ready")
 
         # Start tracing
         context.tracing.start(screenshots=True, snapshots=True, sources=True)
 
-        # Setup console error logging
-        def handle_console(msg):
-            if msg.type == "error":
-                logger.warning(f"Console {msg.type}: {msg.text}")
-        
-        page.on("console", handle_console)
-        logger.info(f"Starting test with {config_browser_name} browser")
+    # Setup console error logging
+    def handle_console(msg):
+        if msg.type == "error":
+            logger.warning(f"Console {msg.type}: {msg.text}")
+    
+    page.on("console", handle_console)
+    logger.info(f"Starting test with {config_browser_name} browser")
 
-        with allure.step(f"Launch {config_browser_name} browser and open new page"):
-            yield page
+    with allure.step(f"Launch {config_browser_name} browser and open new page"):
+        yield page
 
-        # Cleanup and reporting
-        test_name = request.node.name
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        trace_path = os.path.join(trace_dir, f"{test_name}_{timestamp}.zip")
-        
-        try:
+    if monitor and not external:
+        monitor.record_open(browser)
+
+    # Cleanup and reporting
+    test_name = request.node.name
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    trace_path = os.path.join(trace_dir, f"{test_name}_{timestamp}.zip")
+    
+    try:
+        with _phase(request, "trace_stop"):
             context.tracing.stop(path=trace_path)
-            
-            if os.path.exists(trace_path):
+        
+        if os.path.exists(trace_path):
+            _record_artifact(request, "trace", trace_path)
+            request.node.user_properties.append((f"{ARTIFACT_PREFIX}Playwright Trace", trace_path))
+            with _phase(request, "allure_attach"):
                 allure.attach.file(
                     trace_path,
                     name="Playwright Trace",
                     attachment_type="application/zip"
                 )
-        except Exception as e:
-            logger.error(f"Failed to save trace: {e}")
+    except Exception as e:
+        logger.error(f"Failed to save trace: {e}")
 
-        # Handle test failure screenshots
-        if hasattr(request.node, "rep_call") and request.node.rep_call.failed:
-            try:
-                screenshot_dir = "screenshots"
-                os.makedirs(screenshot_dir, exist_ok=True)
-                screenshot_path = os.path.join(screenshot_dir, f"{test_name}_{timestamp}.png")
+    # Handle test failure screenshots
+    if hasattr(request.node, "rep_call") and request.node.rep_call.failed:
+        try:
+            screenshot_dir = "screenshots"
+            os.makedirs(screenshot_dir, exist_ok=True)
+            screenshot_path = os.path.join(screenshot_dir, f"{test_name}_{timestamp}.png")
+            with _phase(request, "screenshot"):
                 page.screenshot(path=screenshot_path, full_page=True)
+            _record_artifact(request, "screenshot", screenshot_path)
 
-                logger.error(f"Test failed. Screenshot saved to: {screenshot_path}")
+            logger.error(f"Test failed. Screenshot saved to: {screenshot_path}")
+            request.node.user_properties.append((f"{ARTIFACT_PREFIX}Failure Screenshot", screenshot_path))
 
-                # Attach to Allure report
+            # Attach to Allure report
+            with _phase(request, "allure_attach"):
                 allure.attach.file(
                     screenshot_path,
                     name="Failure Screenshot",
                     attachment_type=AttachmentType.PNG
                 )
-                
-                # Store screenshot path for HTML report
-                setattr(request.node, 'screenshot_path', screenshot_path)
-                
-            except Exception as e:
-                logger.error(f"Failed to capture screenshot: {e}")
-
-        # Handle video recording
-        video_path = None
-        try:
-            if page.video:
-                video_path = page.video.path()
+            
+            # Store screenshot path for HTML report
+            setattr(request.node, 'screenshot_path', screenshot_path)
+            
         except Exception as e:
-            logger.error(f"Failed to get video path: {e}")
+            logger.error(f"Failed to capture screenshot: {e}")
 
+    # Handle video recording
+    video_path = None
+    try:
+        if page.video and not remote:
+            video_path = page.video.path()
+    except Exception as e:
+        logger.error(f"Failed to get video path: {e}")
+
+    # Closing the context finalizes the video
+    with _phase(request, "video_finalize"):
         # Close browser resources
         try:
             page.close()
             context.close()
-            browser.close()
         except Exception as e:
             logger.error(f"Failed to close browser resources: {e}")
 
-        # Attach video to Allure if available
-        if video_path and os.path.exists(video_path):
+        # Copy the video of a connected browser to the local video dir
+        if page.video and remote:
             try:
+                video_path = os.path.join(context_args["record_video_dir"], f"{test_name}_{timestamp}.webm")
+                page.video.save_as(video_path)
+            except Exception as e:
+                logger.error(f"Failed to save video: {e}")
+                video_path = None
+
+    # Attach video to Allure if available
+    if video_path and os.path.exists(video_path):
+        _record_artifact(request, "video", video_path)
+        request.node.user_properties.append((f"{ARTIFACT_PREFIX}Execution Video", video_path))
+        try:
+            with _phase(request, "allure_attach"):
                 allure.attach.file(
                     video_path,
                     name="Execution Video",
                     attachment_type=AttachmentType.WEBM
                 )
-            except Exception as e:
-                logger.error(f"Failed to attach video: {e}")
+        except Exception as e:
+            logger.error(f"Failed to attach video: {e}")
 
 @pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_makereport(item, call):
@@ -213,3 +631,122 @@ def pytest_runtest_makereport(item, call):
                 '''
                 extra.append(pytest_html.extras.html(html))
                 rep.extra = extra
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Re-run failed tests in the same session, keeping the warm browser"""
+    if not item.config.retry_count:
+        return None
+
+    item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+    outcome = run_with_retries(item, nextitem, item.config.retry_count, item.config.retry_backoff)
+    item.config.flaky_outcomes[item.nodeid] = outcome
+    item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+    return True
+
+def pytest_report_teststatus(report, config):
+    """Report retried attempts as RERUN and passes after a retry as FLAKY"""
+    if report.outcome == "rerun":
+        return "rerun", "R", ("RERUN", {"yellow": True})
+    if report.when == "call" and report.passed and getattr(report, "flaky", False):
+        return "flaky", "K", ("FLAKY", {"yellow": True})
+    return None
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Print startup phase timings, attachment store savings, asset cache and lead pool usage, page performance, resource leaks and flaky tests with their flake rate across runs"""
+    terminalreporter.section("startup timing")
+    for line in startup_timer.report_lines():
+        terminalreporter.write_line(line)
+
+    store = config.attachment_store
+    if store and store.stats["attachments"]:
+        terminalreporter.section("allure attachments")
+        terminalreporter.write_line(
+            f"{store.stats['attachments']} attachment(s), {store.stats['deduplicated']} deduplicated, "
+            f"{store.stats['bytes_saved'] / 1024 / 1024:.1f} MB not copied"
+        )
+
+    cache = config.asset_cache
+    if cache and cache.stats["misses"]:
+        terminalreporter.section("asset cache")
+        terminalreporter.write_line(
+            f"{cache.hit_ratio():.0%} hit ratio: {cache.stats['hits']} hit(s), {cache.stats['revalidated']} revalidated, "
+            f"{cache.stats['misses']} miss(es), {cache.stats['evictions']} eviction(s), "
+            f"{cache.stats['bytes_saved'] / 1024 / 1024:.1f} MB not downloaded"
+        )
+
+    pool = config.lead_pool
+    if pool and pool.stats["created"]:
+        terminalreporter.section("lead pool")
+        terminalreporter.write_line(
+            f"{pool.stats['hits']} hit(s), {pool.stats['misses']} miss(es), "
+            f"{pool.stats['created']} lead(s) created, {pool.stats['deleted']} deleted"
+        )
+
+    recorder = PerfRecorder.active
+    if recorder and recorder.run:
+        terminalreporter.section("page performance")
+        for line in recorder.summary_lines():
+            terminalreporter.write_line(line)
+        for violation in recorder.violations:
+            terminalreporter.write_line(f"Budget exceeded: {violation}", red=recorder.mode == "fail", yellow=recorder.mode == "warn")
+
+    monitor = config.resource_monitor
+    if monitor and (monitor.results or monitor.unmonitored):
+        terminalreporter.section("resource usage")
+        for nodeid, result in monitor.leaking_tests().items():
+            terminalreporter.write_line(f"{nodeid} - {', '.join(result['leaks'])}", yellow=True)
+        if monitor.unmonitored:
+            terminalreporter.write_line(
+                f"{len(monitor.unmonitored)} test(s) ran in browser server or dev daemon browsers outside pytest's process tree and were not sampled"
+            )
+        terminalreporter.write_line(f"Per-test resource report: {config.resource_report}")
+
+    flaky = [nodeid for nodeid, outcome in config.flaky_outcomes.items() if outcome == "flaky"]
+    if not flaky:
+        return
+    terminalreporter.section("flaky tests")
+    for nodeid in flaky:
+        rate = config.flaky_history.flake_rate(nodeid)
+        terminalreporter.write_line(f"{nodeid} - flake rate {rate:.0%}")
+
+def pytest_sessionfinish(session, exitstatus):
+    """Stop the pre-launched browser servers, prune Allure results, write the resource report and persist the latency, page performance and flaky test histories"""
+    config = session.config
+    for prelauncher in config.browser_prelaunchers.values():
+        prelauncher.stop()
+
+    # A collect-only session has no results of its own to make room for
+    if config.allure_results_dir and not config.option.collectonly:
+        try:
+            removed = config.attachment_store.prune(config.allure_results_dir, config.session_start_time)
+            logger.info(f"Pruned Allure results: {removed}")
+        except OSError as e:
+            logger.error(f"Failed to prune Allure results: {e}")
+
+    if config.resource_monitor and (config.resource_monitor.results or config.resource_monitor.unmonitored):
+        try:
+            config.resource_monitor.write_report(config.resource_report)
+        except OSError as e:
+            logger.error(f"Failed to write resource report: {e}")
+
+    if LatencyHistory.active and LatencyHistory.active.data:
+        try:
+            LatencyHistory.active.save()
+        except OSError as e:
+            logger.error(f"Failed to save latency history: {e}")
+
+    if PerfRecorder.active and PerfRecorder.active.run:
+        try:
+            PerfRecorder.active.save()
+        except OSError as e:
+            logger.error(f"Failed to save page performance history: {e}")
+
+    if not config.flaky_outcomes:
+        return
+    for nodeid, outcome in config.flaky_outcomes.items():
+        config.flaky_history.record(nodeid, outcome)
+    try:
+        config.flaky_history.save()
+    except OSError as e:
+        logger.error(f"Failed to save flaky history: {e}")
@@ -6,6 +6,9 @@ from base.base_page import BasePage
 class CreateLeadPage(BasePage):
     """Create Lead page class with methods and selectors"""
     
+    # Page URL
+    URL = "http://leaftaps.com/crmsfa/control/createLeadForm"
+    
     # Selectors
     COMPANY_NAME_INPUT = "#createLeadForm_companyName"
     FIRST_NAME_INPUT = "#createLeadForm_firstName"
@@ -3,9 +3,40 @@ Find Leads Page module with elements and actions
 """
 from base.base_page import BasePage
 
+# Reads every row of the results grid in one round trip
+_READ_GRID_JS = """
+rows => rows.map(row => {
+    const cell = column => {
+        const element = row.querySelector(`.x-grid3-col-${column}`);
+        return element ? element.textContent.trim() : "";
+    };
+    return {id: cell("partyId"), firstName: cell("firstName"), lastName: cell("lastName"), companyName: cell("companyName")};
+})
+"""
+
+# The grid shows the next page once its first row changed
+_PAGE_CHANGED_JS = """
+([selector, previousId]) => {
+    const cell = document.querySelector(`${selector} .x-grid3-col-partyId`);
+    return !cell || cell.textContent.trim() !== previousId;
+}
+"""
+
+
 class FindLeadsPage(BasePage):
     """Find Leads page class with methods and selectors"""
     
+    # Page URL
+    URL = "http://leaftaps.com/crmsfa/control/findLeads"
+    
+    TRANSITIONS = {"ViewLeadPage": "click_first_result"}
+
+    # Performance budgets (times in ms), checked with --perf_budgets
+    BUDGETS = {
+        "navigate": {"load": 5000, "lcp": 4000},
+        "find_leads": {"duration": 5000},
+    }
+    
     # Selectors
     FIRST_NAME_INPUT = "//input[@name='firstName']"
     LAST_NAME_INPUT = "//input[@name='lastName']"
@@ -15,7 +46,10 @@ class FindLeadsPage(BasePage):
     # Results table selectors
     FIRST_RESULT_LINK = "(//div[@class='x-grid3-cell-inner x-grid3-col-partyId']/a)[1]"
     NO_RECORDS_MESSAGE = "//div[text()='No records to display']"
-    
+    RESULT_ROWS = "div.x-grid3-body div.x-grid3-row"
+    NEXT_PAGE_BUTTON = "button.x-tbar-page-next"
+    NEXT_PAGE_DISABLED = "table.x-item-disabled button.x-tbar-page-next"
+
     def __init__(self, page):
         super().__init__(page)
     
@@ -33,9 +67,10 @@ class FindLeadsPage(BasePage):
     
     def click_find_leads(self):
         """Click Find Leads button"""
-        self.click(self.FIND_LEADS_BUTTON)
-        # Wait for results to load
-        self.page.wait_for_load_state("networkidle")
+        with self.measure("find_leads"):
+            self.click(self.FIND_LEADS_BUTTON)
+            # Wait for results to load
+            self.page.wait_for_load_state("networkidle")
     
     def click_first_result(self):
         """Click on the first lead in results"""
@@ -70,4 +105,36 @@ class FindLeadsPage(BasePage):
     
     def are_results_found(self):
         """Check if any search results were found"""
-        return not self.is_visible(self.NO_RECORDS_MESSAGE)
\ No newline at end of file
+        return not self.is_visible(self.NO_RECORDS_MESSAGE)
+
+    def get_result_rows(self, max_pages=None):
+        """
+        Read the results grid into rows, following the paging toolbar
+
+        Each page of the grid is read in a single in-page evaluation instead of one
+        query per cell or a View Lead page per result.
+
+        Args:
+            max_pages: Stop after this many grid pages (default: all)
+
+        Returns:
+            list[dict]: Rows with the lead's "id", "firstName", "lastName" and "companyName"
+        """
+        rows = []
+        pages = 0
+        while True:
+            page_rows = self.page.eval_on_selector_all(self.RESULT_ROWS, _READ_GRID_JS)
+            rows.extend(page_rows)
+            pages += 1
+            if not page_rows or (max_pages and pages >= max_pages) or not self._next_result_page(page_rows[0]["id"]):
+                break
+        self.logger.info(f"Read {len(rows)} result rows from {pages} grid page(s)")
+        return rows
+
+    def _next_result_page(self, first_id):
+        """Open the next page of the grid, returning False on the last page"""
+        if not self.page.locator(self.NEXT_PAGE_BUTTON).count() or self.page.locator(self.NEXT_PAGE_DISABLED).count():
+            return False
+        self.click(self.NEXT_PAGE_BUTTON)
+        self.page.wait_for_function(_PAGE_CHANGED_JS, arg=[self.RESULT_ROWS, first_id])
+        return True
\ No newline at end of file
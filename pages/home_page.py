@@ -8,6 +8,11 @@ Home Page module with home page elements and actions
 class HomePage(BasePage):
     """Home page class with methods and selectors for the home page"""
     
+    # Page URL
+    URL = "http://leaftaps.com/opentaps/control/main"
+    
+    TRANSITIONS = {"MyHomePage": "click_crm_sfa_link", "LoginPage": "logout"}
+    
     # Selectors
     LOGOUT_BUTTON = "a.decorativeSubmit"
     CRMSFA="//a[contains(text(),'CRM/SFA')]"  
@@ -15,6 +20,14 @@ class HomePage(BasePage):
     def __init__(self, page):
         super().__init__(page)
     
+    def navigate_to_home(self):
+        """Navigate to the home page"""
+        self.navigate(self.URL)
+    
+    def is_logged_in(self):
+        """Check if the CRM/SFA link is shown, without waiting for it"""
+        return self.page.is_visible(self.CRMSFA)
+    
     def click_crm_sfa_link(self):
         """Click on the CRM/SFA link"""
         self.click(self.CRMSFA)
@@ -8,6 +8,11 @@ from asyncio import timeout
 class LeadsPage(BasePage):
     """Leads page class with methods and selectors"""
     
+    # Page URL
+    URL = "http://leaftaps.com/crmsfa/control/leadsMain"
+    
+    TRANSITIONS = {"CreateLeadPage": "click_create_lead", "FindLeadsPage": "click_find_leads"}
+    
     # Selectors
     CREATE_LEAD_LINK = "//a[text()='Create Lead']"
     FIND_LEADS_LINK = "//a[text()='Find Leads']"
@@ -1,4 +1,5 @@
 from base.base_page import BasePage
+from utils.perf_budget import PerfRecorder
 """
 Login Page module with login page elements and actions
 """
@@ -14,6 +15,12 @@ class LoginPage(BasePage):
     PASSWORD_INPUT = "#password"
     LOGIN_BUTTON = ".decorativeSubmit"
     ERROR_MESSAGE = "//p[contains(text(),'User not found')]"
+
+    # Performance budgets (times in ms), checked with --perf_budgets
+    BUDGETS = {
+        "navigate": {"load": 5000, "lcp": 4000, "cls": 0.1},
+        "login": {"duration": 5000},
+    }
       
     def __init__(self, page):
         super().__init__(page)
@@ -33,7 +40,13 @@ class LoginPage(BasePage):
     
     def click_login(self):
         """Click the login button"""
-        self.click(self.LOGIN_BUTTON)
+        with self.measure("login"):
+            if PerfRecorder.active is None:
+                self.click(self.LOGIN_BUTTON)
+                return
+            # The form posts back, the measurement covers the page it loads
+            with self.page.expect_navigation():
+                self.click(self.LOGIN_BUTTON)
 
     
     def perform_login(self, username, password):
@@ -6,6 +6,11 @@ My Home Page module with elements and actions
 class MyHomePage(BasePage):
     """My Home page class with methods and selectors"""
     
+    # Page URL
+    URL = "http://leaftaps.com/crmsfa/control/main"
+    
+    TRANSITIONS = {"LeadsPage": "click_leads_tab"}
+    
     # Selectors
     LEADS_LINK = "//a[text()='Leads']"
     ACCOUNTS_LINK = "//a[text()='Accounts']"
@@ -1,3 +1,4 @@
+from urllib.parse import parse_qs, urlsplit
 from base.base_page import BasePage
 """
 View Lead Page module with elements and actions
@@ -7,6 +8,9 @@ View Lead Page module with elements and actions
 class ViewLeadPage(BasePage):
     """View Lead page class with methods and selectors"""
     
+    # Page URL of one lead, formatted with its party id
+    LEAD_URL = "http://leaftaps.com/crmsfa/control/viewLead?partyId={lead_id}"
+    
     # Selectors
     FIRST_NAME = "#viewLead_firstName_sp"
     LAST_NAME = "#viewLead_lastName_sp"
@@ -20,6 +24,14 @@ class ViewLeadPage(BasePage):
     def __init__(self, page):
         super().__init__(page)
 
+    def open_lead(self, lead_id):
+        """Open the view page of a lead by its id"""
+        self.navigate(self.LEAD_URL.format(lead_id=lead_id))
+    
+    def get_lead_id(self):
+        """Get the party id of the lead shown, from the page URL"""
+        return parse_qs(urlsplit(self.page.url).query).get("partyId", [None])[0]
+    
     def get_lead_name(self):
         """Get the lead's full name"""
         first_name = self.get_text(self.FIRST_NAME)
@@ -1,19 +1,9 @@
 import allure
 import pytest
 from playwright.sync_api import Page
-from utils.data_helper import DataHelper
-import csv
 
 
-class DataHelper:
-    @staticmethod
-    def read_form_data_from_csv(file_path):
-        with open(file_path, mode="r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            return [row for row in reader]
-
-
-@pytest.mark.parametrize("data", DataHelper.read_form_data_from_csv("data/sample_form_data.csv"))
+@pytest.mark.csv_data("data", "data/sample_form_data.csv")
 @allure.title("Form automation with data: {data[first_name]} {data[last_name]}")
 def test_example(page: Page, data) -> None:
     with allure.step("Navigate to Application"):
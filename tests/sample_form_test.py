@@ -1,22 +1,13 @@
 # tests/test_form.py
 
+import logging
 import allure
 import pytest
-import csv
 from playwright.sync_api import Page
-from utils.logger import setup_logger
 
-logger = setup_logger()
+logger = logging.getLogger(__name__)
 
-class DataHelper:
-    @staticmethod
-    def read_form_data_from_csv(file_path):
-        with open(file_path, mode="r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            return [row for row in reader]
-
-
-@pytest.mark.parametrize("data", DataHelper.read_form_data_from_csv("data/sample_form_data.csv"))
+@pytest.mark.csv_data("data", "data/sample_form_data.csv")
 @allure.title("Form submission test for {data[first_name]} {data[last_name]}")
 def test_example(page: Page, data) -> None:
     try:
@@ -3,80 +3,36 @@ Test module for find leads functionality
 """
 
 import pytest
-from pages.login_page import LoginPage
-from pages.home_page import HomePage
 from pages.my_home_page import MyHomePage
-from pages.leads_page import LeadsPage
-from pages.create_lead_page import CreateLeadPage
 from pages.find_leads_page import FindLeadsPage
-from pages.view_lead_page import ViewLeadPage
-from utils.data_helper import DataHelper
 
 class TestFindLeads:
     """Test class for find leads functionality"""
     
-    @pytest.fixture(scope="function")
-    def authenticated_page(self, page, test_data):
-        """Fixture to perform login and return authenticated page"""
-        login_page = LoginPage(page)
-        home_page = HomePage(page)
-        
-        login_page.navigate_to_login()
-        login_page.perform_login(
-            test_data["valid_user"]["username"],
-            test_data["valid_user"]["password"]
-        )
-        
-        home_page.click_crm_sfa_link()
-        return page
-    
-    @pytest.fixture(scope="function")
-    def created_lead(self, authenticated_page):
-        """Fixture to create a test lead and return its data"""
-        lead_data = DataHelper.generate_test_lead_data()
-        
-        my_home_page = MyHomePage(authenticated_page)
-        leads_page = LeadsPage(authenticated_page)
-        create_lead_page = CreateLeadPage(authenticated_page)
-
-        my_home_page.click_leads_tab()
-        leads_page.click_create_lead()
-        create_lead_page.create_new_lead(lead_data)
-        my_home_page.click_leads_tab()
-
-        return lead_data
-    
-    def test_find_by_first_name(self, authenticated_page, created_lead):
+    def test_find_by_first_name(self, authenticated_page, pooled_lead):
         """Test searching for leads by first name"""
         my_home_page = MyHomePage(authenticated_page)
-        leads_page = LeadsPage(authenticated_page)
-        find_leads_page = FindLeadsPage(authenticated_page)
-        view_lead_page = ViewLeadPage(authenticated_page)
         
-        my_home_page.click_leads_tab()
-        leads_page.click_find_leads()
-        #leads_page.search_created_lead(created_lead["firstName"])
+        find_leads_page = my_home_page.navigate_to(FindLeadsPage)
 
-        find_leads_page.search_by_name(first_name=created_lead["firstName"])
-        assert find_leads_page.are_results_found(), f"No results for first name: {created_lead['firstName']}"
+        find_leads_page.search_by_name(first_name=pooled_lead["firstName"])
+        assert find_leads_page.are_results_found(), f"No results for first name: {pooled_lead['firstName']}"
 
-        find_leads_page.click_first_result()
-        actual_first_name = view_lead_page.get_text(view_lead_page.FIRST_NAME)
-        assert actual_first_name == created_lead["firstName"], f"Expected: {created_lead['firstName']}, Got: {actual_first_name}"
+        rows = find_leads_page.get_result_rows()
+        mismatched = [row for row in rows if pooled_lead["firstName"].lower() not in row["firstName"].lower()]
+        assert not mismatched, f"Expected first names matching {pooled_lead['firstName']}, Got: {mismatched}"
+        assert pooled_lead["id"] in [row["id"] for row in rows], f"Lead {pooled_lead['id']} not in results: {rows}"
 
-    def test_find_by_company_name(self, authenticated_page, created_lead):
+    def test_find_by_company_name(self, authenticated_page, pooled_lead):
         """Test searching for leads by company name"""
         my_home_page = MyHomePage(authenticated_page)
-        leads_page = LeadsPage(authenticated_page)
-        find_leads_page = FindLeadsPage(authenticated_page)
-        view_lead_page = ViewLeadPage(authenticated_page)
         
-        my_home_page.click_leads_tab()
-        leads_page.click_find_leads()
+        find_leads_page = my_home_page.navigate_to(FindLeadsPage)
 
-        find_leads_page.search_by_company(created_lead["companyName"])
-        assert find_leads_page.are_results_found(), f"No results for company: {created_lead['companyName']}"
+        find_leads_page.search_by_company(pooled_lead["companyName"])
+        assert find_leads_page.are_results_found(), f"No results for company: {pooled_lead['companyName']}"
 
-        find_leads_page.click_first_result()
-        actual_company = view_lead_page.get_text(view_lead_page.COMPANY_NAME)
-        assert actual_company == created_lead["companyName"], f"Expected: {created_lead['companyName']}, Got: {actual_company}"
+        rows = find_leads_page.get_result_rows()
+        lead_row = next((row for row in rows if row["id"] == pooled_lead["id"]), None)
+        assert lead_row, f"Lead {pooled_lead['id']} not in results: {rows}"
+        assert lead_row["companyName"] == pooled_lead["companyName"], f"Expected: {pooled_lead['companyName']}, Got: {lead_row['companyName']}"
@@ -0,0 +1,150 @@
+"""
+Unit tests for splitting the suite into shards and merging the shards' results
+"""
+import json
+import os
+
+import pytest
+
+from utils.sharding import assign_shards, merge, merge_counts, merge_durations, merge_samples, parse_shard
+
+PATHS = {
+    "allure_results": "allure-results",
+    "report_dir": "report",
+    "metrics_dir": "metrics",
+    "durations": ".test_durations.json",
+    "latency_history": ".latency_history.json",
+    "perf_history": ".perf_history.json",
+    "flaky_history": ".flaky_history.json",
+    "artifact_dirs": ["traces", "screenshots", "videos"],
+}
+
+
+def _write(directory, name, data):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, name), "w", encoding="utf-8") as file:
+        json.dump(data, file)
+
+
+def _read(directory, name):
+    with open(os.path.join(directory, name), "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+class TestShardAssignment:
+    """Tests for the duration based split of the suite"""
+
+    def test_parse_shard(self):
+        """Test that i/n is parsed and out of range shards are rejected"""
+        assert parse_shard("2/4") == (2, 4)
+        assert parse_shard(" 1 / 1 ") == (1, 1)
+        for value in ("0/4", "5/4", "2", "a/b", None):
+            with pytest.raises(ValueError):
+                parse_shard(value)
+
+    def test_every_test_in_one_shard(self):
+        """Test that every collected test is assigned to exactly one existing shard"""
+        nodeids = [f"tests/test_a.py::test_{index}" for index in range(20)]
+        durations = {nodeid: index + 1.0 for index, nodeid in enumerate(nodeids[:10])}
+        assignment, loads = assign_shards(nodeids, durations, 3)
+        assert sorted(assignment) == sorted(nodeids)
+        assert set(assignment.values()) <= {0, 1, 2}
+        assert len(loads) == 3
+
+    def test_balanced_shard_totals(self):
+        """Test that the shard totals differ by at most the longest test"""
+        durations = {f"tests/test_a.py::test_{index}": float(seconds) for index, seconds in enumerate([30, 25, 20, 12, 9, 8, 7, 5, 3, 2, 1, 1])}
+        assignment, loads = assign_shards(list(durations), durations, 4)
+        totals = [0.0] * 4
+        for nodeid, shard in assignment.items():
+            totals[shard] += durations[nodeid]
+        assert totals == loads
+        assert max(loads) - min(loads) <= max(durations.values())
+        assert sum(loads) == sum(durations.values())
+
+    def test_stable_when_test_added(self):
+        """Test that adding a test without history leaves the tests with history on their shards"""
+        durations = {f"tests/test_a.py::test_{index}": float(index % 7 + 1) for index in range(15)}
+        before, _ = assign_shards(list(durations), durations, 4)
+        after, _ = assign_shards(list(durations) + ["tests/test_b.py::test_new"], durations, 4)
+        assert {nodeid: after[nodeid] for nodeid in durations} == before
+        assert "tests/test_b.py::test_new" in after
+
+    def test_same_split_on_every_node(self):
+        """Test that the split does not depend on the collection order"""
+        nodeids = [f"tests/test_a.py::test_{index}" for index in range(12)]
+        durations = {nodeid: 2.0 for nodeid in nodeids[:4]}
+        assert assign_shards(nodeids, durations, 3) == assign_shards(list(reversed(nodeids)), durations, 3)
+
+    def test_unknown_tests_estimated_at_median(self):
+        """Test that tests without history are counted at the median recorded duration"""
+        durations = {"tests/test_a.py::test_1": 1.0, "tests/test_a.py::test_2": 3.0, "tests/test_a.py::test_3": 5.0}
+        _, loads = assign_shards(list(durations) + ["tests/test_b.py::test_new"], durations, 2)
+        assert sum(loads) == 9.0 + 3.0
+
+    def test_no_history(self):
+        """Test that without any history the tests are spread evenly at one second each"""
+        nodeids = [f"tests/test_a.py::test_{index}" for index in range(9)]
+        assignment, loads = assign_shards(nodeids, {}, 3)
+        assert loads == [3.0, 3.0, 3.0]
+        assert sorted(assignment.values()) == [0, 0, 0, 1, 1, 1, 2, 2, 2]
+
+
+class TestHistoryMerge:
+    """Tests for merging the histories the shards wrote"""
+
+    def test_merge_durations_keeps_latest(self):
+        """Test that the entry of the shard that ran a test last wins"""
+        first = {"t1": {"duration": 1.0, "updated": 10}, "t2": {"duration": 2.0, "updated": 30}}
+        second = {"t1": {"duration": 1.5, "updated": 20}, "t2": {"duration": 2.5, "updated": 20}}
+        merged = merge_durations([first, second])
+        assert merged == {"t1": {"duration": 1.5, "updated": 20}, "t2": {"duration": 2.0, "updated": 30}}
+
+    def test_merge_samples_against_base(self):
+        """Test that the new samples of both shards are appended to the base"""
+        base = {"goto": {"home": [1, 2, 3]}}
+        first = {"goto": {"home": [1, 2, 3, 4]}}
+        second = {"goto": {"home": [1, 2, 3, 5, 6]}, "click": {"login": [7]}}
+        merged = merge_samples([first, second], base)
+        assert merged == {"goto": {"home": [1, 2, 3, 4, 5, 6]}, "click": {"login": [7]}}
+
+    def test_merge_samples_trimmed_base(self):
+        """Test that a shard whose history was trimmed at the front only adds its new samples"""
+        base = {"goto": {"home": [1, 2, 3, 4]}}
+        first = {"goto": {"home": [3, 4, 5]}}
+        merged = merge_samples([first], base, max_samples=200)
+        assert merged == {"goto": {"home": [1, 2, 3, 4, 5]}}
+
+    def test_merge_samples_without_base(self):
+        """Test that without a base the longest list of each key is kept"""
+        merged = merge_samples([{"goto": {"home": [1, 2]}}, {"goto": {"home": [1, 2, 3]}}], None)
+        assert merged == {"goto": {"home": [1, 2, 3]}}
+
+    def test_merge_counts_against_base(self):
+        """Test that the runs each shard added are summed on top of the base"""
+        base = {"t1": {"runs": 2, "passed": 2, "flaky": 0, "failed": 0}}
+        first = {"t1": {"runs": 3, "passed": 2, "flaky": 1, "failed": 0}}
+        second = {"t1": {"runs": 4, "passed": 4, "flaky": 0, "failed": 0}, "t2": {"runs": 1, "passed": 0, "flaky": 0, "failed": 1}}
+        merged = merge_counts([first, second], base)
+        assert merged["t1"] == {"runs": 5, "passed": 4, "flaky": 1, "failed": 0}
+        assert merged["t2"] == {"runs": 1, "passed": 0, "flaky": 0, "failed": 1}
+
+    def test_merge_two_shards_against_base(self, tmp_path):
+        """Test that merging two shard directories against a base writes the combined histories"""
+        base_dir, shard_1, shard_2, output = (str(tmp_path / name) for name in ("base", "shard-1", "shard-2", "merged"))
+        _write(base_dir, PATHS["latency_history"], {"goto": {"home": [100, 120]}})
+        _write(base_dir, PATHS["flaky_history"], {"t1": {"runs": 1, "passed": 1, "flaky": 0, "failed": 0}})
+        _write(shard_1, PATHS["latency_history"], {"goto": {"home": [100, 120, 130]}})
+        _write(shard_1, PATHS["flaky_history"], {"t1": {"runs": 2, "passed": 1, "flaky": 1, "failed": 0}})
+        _write(shard_1, PATHS["durations"], {"t1": {"duration": 4.0, "updated": 1}})
+        _write(shard_2, PATHS["latency_history"], {"goto": {"home": [100, 120, 140]}})
+        _write(shard_2, PATHS["flaky_history"], {"t1": {"runs": 2, "passed": 2, "flaky": 0, "failed": 0}})
+        _write(shard_2, PATHS["durations"], {"t2": {"duration": 6.0, "updated": 1}})
+
+        summary = merge([shard_1, shard_2], output, PATHS, base_dir)
+
+        assert _read(output, PATHS["latency_history"]) == {"goto": {"home": [100, 120, 130, 140]}}
+        assert _read(output, PATHS["flaky_history"]) == {"t1": {"runs": 3, "passed": 2, "flaky": 1, "failed": 0}}
+        assert set(_read(output, PATHS["durations"])) == {"t1", "t2"}
+        assert summary["durations"] == 2
+        assert "perf_history" not in summary
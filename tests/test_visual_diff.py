@@ -0,0 +1,132 @@
+"""
+Unit tests for the screenshot comparison used by the visual checks
+"""
+import numpy as np
+import pytest
+
+from utils.visual_diff import compare_images, decode_png, encode_png, hash_distance, perceptual_hash, region_mask
+
+
+def _solid(height=64, width=64, color=(255, 255, 255)):
+    image = np.empty((height, width, 4), dtype=np.uint8)
+    image[...] = (*color, 255)
+    return image
+
+
+def _halves(left, right, height=64, width=64):
+    image = _solid(height, width, left)
+    image[:, width // 2:, :3] = right
+    return image
+
+
+class TestCompareImages:
+    """Tests for comparing a capture with its baseline"""
+
+    def test_identical_images_match(self):
+        """Test that identical pixels pass without a diff"""
+        result = compare_images(_solid(), _solid())
+        assert result["match"]
+        assert result["diff_pixels"] == 0
+        assert result["diff_image"] is None
+
+    def test_size_mismatch_fails(self):
+        """Test that a capture of another size fails with the sizes in the reason"""
+        result = compare_images(_solid(64, 64), _solid(32, 64))
+        assert not result["match"]
+        assert result["reason"] == "size 64x32 differs from baseline 64x64"
+
+    def test_change_below_threshold_matches(self):
+        """Test that a color change within the threshold is not counted"""
+        actual = _solid()
+        actual[10:20, 10:20, :3] = 250
+        result = compare_images(_solid(), actual, threshold=0.1)
+        assert result["match"]
+        assert result["diff_pixels"] == 0
+
+    def test_change_above_threshold_counted(self):
+        """Test that the same change counts once the threshold is tighter than it"""
+        actual = _solid()
+        actual[10:20, 10:20, :3] = 250
+        result = compare_images(_solid(), actual, threshold=0.01, max_diff_ratio=0.0)
+        assert not result["match"]
+        assert result["diff_pixels"] == 100
+
+    def test_diff_ratio_over_limit_fails(self):
+        """Test that a small square of a different color fails on the share of differing pixels"""
+        actual = _solid()
+        actual[28:36, 28:36, :3] = 0
+        result = compare_images(_solid(), actual)
+        assert not result["match"]
+        assert result["hash_distance"] <= 10
+        assert result["diff_pixels"] == 64
+        assert result["diff_ratio"] == pytest.approx(64 / 4096)
+        assert result["diff_image"].shape == (64, 64, 3)
+        assert tuple(result["diff_image"][30, 30]) == (255, 0, 0)
+
+    def test_diff_ratio_within_limit_matches(self):
+        """Test that a few differing pixels pass when max_diff_ratio allows them"""
+        actual = _solid()
+        actual[0, 0, :3] = 0
+        assert compare_images(_solid(), actual, max_diff_ratio=0.001)["match"]
+        assert not compare_images(_solid(), actual, max_diff_ratio=0.0)["match"]
+
+    def test_masked_region_ignored(self):
+        """Test that changes inside a masked region do not count"""
+        actual = _solid()
+        actual[20:40, 20:40, :3] = 0
+        result = compare_images(_solid(), actual, regions=[(20, 20, 20, 20)])
+        assert result["match"]
+        assert result["diff_pixels"] == 0
+
+    def test_change_outside_mask_counted(self):
+        """Test that a mask only hides the pixels it covers"""
+        actual = _solid()
+        actual[20:40, 20:40, :3] = 0
+        result = compare_images(_solid(), actual, regions=[(20, 20, 10, 20)], max_diff_ratio=0.0)
+        assert not result["match"]
+        assert result["diff_pixels"] == 200
+
+    def test_hash_distance_fails_early(self):
+        """Test that a different layout fails on the perceptual hash without counting pixels"""
+        result = compare_images(_halves((255, 255, 255), (0, 0, 0)), _halves((0, 0, 0), (255, 255, 255)))
+        assert not result["match"]
+        assert result["hash_distance"] > 10
+        assert result["reason"] == f"perceptual hash differs by {result['hash_distance']} bits"
+        assert result["diff_pixels"] == 0
+        assert result["diff_image"] is not None
+
+    def test_hash_distance_limit(self):
+        """Test that raising max_hash_distance hands the same images to the pixel diff"""
+        result = compare_images(_halves((255, 255, 255), (0, 0, 0)), _halves((0, 0, 0), (255, 255, 255)), max_hash_distance=64)
+        assert not result["match"]
+        assert result["diff_pixels"] == 4096
+
+
+class TestImageHelpers:
+    """Tests for the decoding, hashing and masking helpers"""
+
+    def test_decode_png_round_trip(self):
+        """Test that decoding an encoded image gives back the same RGBA pixels"""
+        image = _halves((255, 0, 0), (0, 0, 255), 8, 16)
+        decoded = decode_png(encode_png(image))
+        assert decoded.dtype == np.uint8
+        assert decoded.shape == (8, 16, 4)
+        assert np.array_equal(decoded, image)
+
+    def test_decode_png_adds_alpha(self):
+        """Test that an RGB PNG is decoded with an opaque alpha channel"""
+        decoded = decode_png(encode_png(np.zeros((4, 4, 3), dtype=np.uint8)))
+        assert decoded.shape == (4, 4, 4)
+        assert (decoded[..., 3] == 255).all()
+
+    def test_perceptual_hash(self):
+        """Test that equal layouts hash the same and inverted layouts far apart"""
+        white_left = _halves((255, 255, 255), (0, 0, 0))
+        assert hash_distance(perceptual_hash(white_left), perceptual_hash(white_left.copy())) == 0
+        assert hash_distance(perceptual_hash(white_left), perceptual_hash(_halves((0, 0, 0), (255, 255, 255)))) > 10
+
+    def test_region_mask_clipped(self):
+        """Test that regions are rounded outward and clipped to the image"""
+        mask = region_mask((10, 10), [(8.5, -2, 5, 4.2)])
+        assert mask.sum() == 2 * 3
+        assert mask[0:3, 8:10].all()
@@ -0,0 +1,79 @@
+"""
+Adaptive timeout module deriving action timeouts from the latencies observed in previous runs
+"""
+import json
+import logging
+import os
+
+from utils.trace_analyzer import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistory:
+    """Action latencies per page class and selector stored in a local JSON file across runs"""
+
+    # History used by the page objects, None when adaptive timeouts are off
+    active = None
+
+    def __init__(self, file_path, multiplier=3.0, floor_ms=2000, min_samples=20, max_samples=200):
+        """
+        Args:
+            file_path: JSON file keeping the latencies
+            multiplier: Timeout as a multiple of the p99 latency
+            floor_ms: Shortest timeout ever derived
+            min_samples: Latencies needed before a selector gets an adaptive timeout
+            max_samples: Latencies kept per selector, the oldest are dropped
+        """
+        self.file_path = file_path
+        self.multiplier = multiplier
+        self.floor_ms = floor_ms
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.data = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return {}
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable latency history {self.file_path}: {e}")
+            return {}
+
+    def record(self, page_class, selector, latency_ms):
+        """
+        Record the latency of a successful action
+
+        Args:
+            page_class: Name of the page object class
+            selector: Selector the action ran on
+            latency_ms: Time the action took, including auto-waiting
+        """
+        samples = self.data.setdefault(page_class, {}).setdefault(selector, [])
+        samples.append(round(latency_ms, 1))
+        del samples[:-self.max_samples]
+
+    def timeout_for(self, page_class, selector, ceiling_ms):
+        """
+        Get the timeout of an action
+
+        Args:
+            page_class: Name of the page object class
+            selector: Selector the action runs on
+            ceiling_ms: Configured timeout, never exceeded
+
+        Returns:
+            int: multiplier x p99 latency between the floor and the ceiling, or the ceiling without enough history
+        """
+        samples = self.data.get(page_class, {}).get(selector, [])
+        if len(samples) < self.min_samples:
+            return ceiling_ms
+        timeout = percentile(samples, 99) * self.multiplier
+        return int(min(ceiling_ms, max(self.floor_ms, timeout)))
+
+    def save(self):
+        """Write the history back to disk"""
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            json.dump(self.data, file, indent=2, sort_keys=True)
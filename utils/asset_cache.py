@@ -0,0 +1,166 @@
+"""
+Asset cache module serving static responses from memory to every browser context of the worker
+"""
+import logging
+import re
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATTERN = r"\.(css|js|png|jpe?g|gif|svg|ico|woff2?|ttf)(\?.*)?$"
+
+CACHEABLE_TYPES = ("text/css", "javascript", "image/", "font/")
+
+# Headers describing the transfer, not the content: the body is stored decoded
+HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+def _parse_cache_control(value):
+    directives = {}
+    for part in (value or "").lower().split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name] = argument.strip('"')
+    return directives
+
+
+def _http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def freshness_lifetime(headers, default_ttl):
+    """
+    Seconds a response may be served without revalidation, following the HTTP caching rules of a shared cache
+
+    Args:
+        headers: Response headers, lower case names
+        default_ttl: Lifetime of responses without freshness information or validators
+
+    Returns:
+        float: Lifetime in seconds, None if the response must not be stored
+    """
+    directives = _parse_cache_control(headers.get("cache-control"))
+    if "no-store" in directives or "private" in directives:
+        return None
+    vary = {name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip()}
+    if vary - {"accept-encoding"}:
+        return None
+    if "no-cache" in directives:
+        return 0
+    for name in ("s-maxage", "max-age"):
+        if directives.get(name, "").isdigit():
+            return int(directives[name])
+
+    date = _http_date(headers.get("date")) or time.time()
+    if "expires" in headers:
+        # An invalid date such as "0" means already expired
+        expires = _http_date(headers["expires"])
+        return max(0, expires - date) if expires else 0
+    last_modified = _http_date(headers.get("last-modified"))
+    if last_modified:
+        # Heuristic freshness: a tenth of the time since the last modification
+        return max(0, (date - last_modified) / 10)
+    return default_ttl
+
+
+class AssetCache:
+    """Bounded LRU cache of static GET responses, installed on contexts through routing"""
+
+    def __init__(self, max_mb=64, pattern=DEFAULT_PATTERN, default_ttl=300):
+        """
+        Args:
+            max_mb: Memory budget of the cached bodies
+            pattern: Regular expression of the URLs routed through the cache
+            default_ttl: Lifetime of responses without cache headers
+        """
+        self.max_bytes = max_mb * 1024 * 1024
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+        self.default_ttl = default_ttl
+        self.entries = OrderedDict()
+        self.size = 0
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "bytes_saved": 0, "evictions": 0}
+
+    def attach(self, context):
+        """Route the static requests of a browser context through the cache"""
+        context.route(self.pattern, self._handle)
+
+    def _handle(self, route, request):
+        if request.method != "GET":
+            route.continue_()
+            return
+
+        url = request.url
+        entry = self.entries.get(url)
+        if entry and entry["expires"] > time.time():
+            self._serve(route, url, entry)
+            self.stats["hits"] += 1
+            return
+
+        headers = dict(request.headers)
+        if entry and entry["headers"].get("etag"):
+            headers["if-none-match"] = entry["headers"]["etag"]
+        if entry and entry["headers"].get("last-modified"):
+            headers["if-modified-since"] = entry["headers"]["last-modified"]
+        try:
+            response = route.fetch(headers=headers)
+        except Exception as e:
+            logger.debug(f"Asset cache could not fetch {url}: {e}")
+            route.continue_()
+            return
+
+        if entry and response.status == 304:
+            # Still valid: the server only sent headers
+            lifetime = freshness_lifetime({**entry["headers"], **response.headers}, self.default_ttl) or 0
+            entry["expires"] = time.time() + lifetime
+            self._serve(route, url, entry)
+            self.stats["revalidated"] += 1
+            return
+
+        self.stats["misses"] += 1
+        self._store(url, response)
+        route.fulfill(response=response)
+
+    def _serve(self, route, url, entry):
+        self.entries.move_to_end(url)
+        self.stats["bytes_saved"] += len(entry["body"])
+        route.fulfill(status=entry["status"], headers=entry["headers"], body=entry["body"])
+
+    def _store(self, url, response):
+        content_type = response.headers.get("content-type", "")
+        if response.status != 200 or not any(kind in content_type for kind in CACHEABLE_TYPES):
+            return
+        lifetime = freshness_lifetime(response.headers, self.default_ttl)
+        if lifetime is None:
+            return
+        body = response.body()
+        if len(body) > self.max_bytes:
+            return
+
+        self._remove(url)
+        self.entries[url] = {
+            "status": response.status,
+            "headers": {name: value for name, value in response.headers.items() if name not in HOP_HEADERS},
+            "body": body,
+            "expires": time.time() + lifetime,
+        }
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def _remove(self, url):
+        entry = self.entries.pop(url, None)
+        if entry:
+            self.size -= len(entry["body"])
+
+    def hit_ratio(self):
+        """Share of routed requests answered without downloading the body"""
+        served = self.stats["hits"] + self.stats["revalidated"]
+        total = served + self.stats["misses"]
+        return served / total if total else 0.0
@@ -0,0 +1,311 @@
+"""
+Attachment store module keeping Allure attachments once per content hash and hardlinking them into allure-results
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
+import allure_commons
+from allure_commons.logger import AllureFileLogger
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+TEXT_EXTENSIONS = {"txt", "csv", "tsv", "uri", "html", "xml", "json", "yaml", "svg", "log"}
+
+
+def file_digest(file_path):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(source, destination):
+    """Hardlink a file, copying it when the two paths are on different file systems"""
+    try:
+        os.link(source, destination)
+        return True
+    except OSError:
+        shutil.copy2(source, destination)
+        return False
+
+
+def _attachment_sources(node):
+    """Collect the attachment file names referenced anywhere in an Allure result or container"""
+    if isinstance(node, dict):
+        sources = set()
+        for attachment in node.get("attachments", []):
+            sources.add(attachment.get("source"))
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                sources |= _attachment_sources(value)
+        return sources
+    if isinstance(node, list):
+        return set().union(*(_attachment_sources(value) for value in node))
+    return set()
+
+
+class AttachmentStore:
+    """Content-addressed blob directory that allure-results attachments are linked to"""
+
+    def __init__(self, store_dir, compress_text=True, max_age_days=14, max_size_mb=2048):
+        """
+        Args:
+            store_dir: Directory keeping one blob per attachment content
+            compress_text: Gzip text blobs once no kept result uses them
+            max_age_days: Results and unused blobs older than this are pruned, 0 to disable
+            max_size_mb: Disk budget of allure-results and the store together, 0 to disable
+        """
+        self.store_dir = store_dir
+        self.compress_text = compress_text
+        self.max_age = max_age_days * 24 * 3600
+        self.max_size = max_size_mb * 1024 * 1024
+        self.stats = {"attachments": 0, "deduplicated": 0, "bytes_saved": 0}
+        os.makedirs(store_dir, exist_ok=True)
+
+    def _blob_path(self, digest, extension):
+        return os.path.join(self.store_dir, digest[:2], f"{digest}.{extension}")
+
+    def add_file(self, source, destination, source_kept=True):
+        """
+        Store a file once and place it at the destination in allure-results
+
+        Args:
+            source: Attachment file, e.g. a trace zip or video
+            destination: Path allure-results expects the attachment at
+            source_kept: The source stays on disk, so linking the blob to it saves its size
+        """
+        extension = os.path.splitext(destination)[1].lstrip(".").lower()
+        blob = self._blob_path(file_digest(source), extension)
+        size = os.path.getsize(source)
+        self.stats["attachments"] += 1
+
+        if os.path.exists(blob):
+            self.stats["deduplicated"] += 1
+            # The modification time of a blob is the last time it was used
+            os.utime(blob)
+            if _link_or_copy(blob, destination):
+                self.stats["bytes_saved"] += size
+            return
+
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        if os.path.exists(f"{blob}.gz"):
+            # Compressed while no result used it: unpacked again so results can link to it, nothing is saved
+            self.stats["deduplicated"] += 1
+            with gzip.open(f"{blob}.gz", "rb") as packed, open(f"{blob}.tmp", "wb") as raw:
+                shutil.copyfileobj(packed, raw, CHUNK_SIZE)
+            os.replace(f"{blob}.tmp", blob)
+            os.remove(f"{blob}.gz")
+        elif _link_or_copy(source, blob) and source_kept:
+            # The source file and the blob are the same inode
+            self.stats["bytes_saved"] += size
+        _link_or_copy(blob, destination)
+
+    def add_data(self, body, destination):
+        """
+        Store attachment content passed with allure.attach and place it at the destination
+
+        Args:
+            body: Attachment content (str or bytes)
+            destination: Path allure-results expects the attachment at
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        with open(f"{destination}.tmp", "wb") as file:
+            file.write(body)
+        try:
+            self.add_file(f"{destination}.tmp", destination, source_kept=False)
+        finally:
+            os.remove(f"{destination}.tmp")
+
+    def _disk_usage(self, *directories):
+        """Bytes used by the files of some directories, counting each hardlinked inode once"""
+        inodes = {}
+        for directory in directories:
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    stat = os.stat(os.path.join(root, name))
+                    inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+        return sum(inodes.values())
+
+    @staticmethod
+    def _inode(path):
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError):
+            return None
+        return (stat.st_dev, stat.st_ino), stat.st_size
+
+    def _references(self, results_dir, names):
+        """
+        Read which attachments the results use
+
+        Link counts cannot tell this: a blob may also be linked from traces/ or videos/.
+
+        Returns:
+            tuple: ({result name: {attachment inode: size}}, {attachment inode: number of results using it})
+        """
+        used = {}
+        counts = {}
+        for name in names:
+            try:
+                with open(os.path.join(results_dir, name), "r", encoding="utf-8") as file:
+                    sources = _attachment_sources(json.load(file))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Failed to read Allure result {name}: {e}")
+                sources = set()
+            inodes = dict(filter(None, (self._inode(os.path.join(results_dir, source)) for source in sources if source)))
+            used[name] = inodes
+            for inode in inodes:
+                counts[inode] = counts.get(inode, 0) + 1
+        return used, counts
+
+    def prune(self, results_dir, since):
+        """
+        Remove old results and the blobs no longer used by them
+
+        Results of the current run are never removed.
+
+        Args:
+            results_dir: allure-results directory
+            since: Start time of the current run (epoch seconds)
+
+        Returns:
+            dict: {"results": removed result files, "attachments": removed attachments, "blobs": removed blobs,
+                   "compressed": text blobs gzipped}
+        """
+        removed = {"results": 0, "attachments": 0, "blobs": 0}
+        now = time.time()
+        results = sorted(
+            (os.path.getmtime(os.path.join(results_dir, name)), name)
+            for name in os.listdir(results_dir)
+            if name.endswith(("-result.json", "-container.json"))
+        )
+        used, counts = self._references(results_dir, [name for _, name in results])
+        usage = self._disk_usage(results_dir, self.store_dir)
+
+        kept = []
+        for modified, name in results:
+            expired = self.max_age and now - modified > self.max_age
+            over_budget = self.max_size and usage > self.max_size
+            if modified < since and (expired or over_budget):
+                path = os.path.join(results_dir, name)
+                usage -= os.path.getsize(path)
+                # An attachment, and the blob it is linked to, is released with the last result using it
+                for inode, size in used.pop(name).items():
+                    counts[inode] -= 1
+                    if not counts[inode]:
+                        usage -= size
+                os.remove(path)
+                removed["results"] += 1
+            else:
+                kept.append(name)
+
+        referenced = {inode for inodes in used.values() for inode in inodes}
+        if removed["results"]:
+            for name in os.listdir(results_dir):
+                if "-attachment" in name:
+                    path = os.path.join(results_dir, name)
+                    inode = self._inode(path)
+                    if inode and inode[0] not in referenced:
+                        os.remove(path)
+                        removed["attachments"] += 1
+
+        # Blobs no kept result is linked to, compressed text blobs are never linked and are pruned by last use
+        blobs = []
+        for root, _, names in os.walk(self.store_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                if (stat.st_dev, stat.st_ino) not in referenced and stat.st_mtime < since:
+                    blobs.append((stat.st_mtime, path, stat.st_size))
+        usage = self._disk_usage(results_dir, self.store_dir)
+        for modified, path, size in sorted(blobs):
+            expired = self.max_age and now - modified > self.max_age
+            over_budget = self.max_size and usage > self.max_size
+            if not (expired or over_budget):
+                continue
+            os.remove(path)
+            usage -= size
+            removed["blobs"] += 1
+
+        if self.compress_text:
+            removed["compressed"] = self._compress_unused(referenced, since)
+            usage = self._disk_usage(results_dir, self.store_dir)
+
+        if self.max_size and usage > self.max_size:
+            logger.warning(f"Allure results still use {usage / 1024 / 1024:.0f} MB after pruning, the current run alone exceeds the budget")
+        return removed
+
+
+    def _compress_unused(self, referenced, since):
+        """Gzip the text blobs kept for deduplication that no result links to"""
+        compressed = 0
+        for root, _, names in os.walk(self.store_dir):
+            for name in names:
+                if name.rsplit(".", 1)[-1] not in TEXT_EXTENSIONS:
+                    continue
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                # Still linked from a result, or from a file outside the store, gzip would free nothing
+                if (stat.st_dev, stat.st_ino) in referenced or stat.st_nlink > 1 or stat.st_mtime >= since:
+                    continue
+                with open(path, "rb") as raw, gzip.open(f"{path}.gz.tmp", "wb") as packed:
+                    shutil.copyfileobj(raw, packed, CHUNK_SIZE)
+                os.utime(f"{path}.gz.tmp", (stat.st_atime, stat.st_mtime))
+                os.replace(f"{path}.gz.tmp", f"{path}.gz")
+                os.remove(path)
+                compressed += 1
+        return compressed
+
+
+class StoreFileLogger(AllureFileLogger):
+    """Allure file logger writing attachments through the attachment store instead of copying them"""
+
+    def __init__(self, report_dir, store):
+        super().__init__(report_dir)
+        self.store = store
+
+    @allure_commons.hookimpl
+    def report_attached_file(self, source, file_name):
+        self.store.add_file(source, str(self._report_dir / file_name))
+
+    @allure_commons.hookimpl
+    def report_attached_data(self, body, file_name):
+        self.store.add_data(body, str(self._report_dir / file_name))
+
+
+def install_store_logger(store):
+    """
+    Replace the file logger registered by allure-pytest with one writing through the store
+
+    Args:
+        store: AttachmentStore
+
+    Returns:
+        tuple: (allure-results directory, function restoring the original logger), or None when Allure is not reporting
+    """
+    plugin_manager = allure_commons.plugin_manager
+    original = next((plugin for plugin in plugin_manager.get_plugins() if type(plugin) is AllureFileLogger), None)
+    if original is None:
+        return None
+
+    name = plugin_manager.get_name(original)
+    plugin_manager.unregister(plugin=original)
+    store_logger = StoreFileLogger(original._report_dir, store)
+    plugin_manager.register(store_logger, name)
+
+    def restore():
+        # allure-pytest unregisters its own logger when the session ends
+        plugin_manager.unregister(plugin=store_logger)
+        plugin_manager.register(original, name)
+
+    return str(original._report_dir), restore
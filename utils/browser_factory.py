@@ -0,0 +1,85 @@
+"""
+Browser factory module resolving Playwright launch and context settings
+"""
+
+
+def get_launch_settings(playwright, browser_name, browser_type_launch_args, browser_context_args):
+    """
+    Resolve the browser type, launch args and context args for a browser name
+
+    Args:
+        playwright: Started Playwright instance
+        browser_name: Browser name (chrome, msedge, firefox, webkit or chromium)
+        browser_type_launch_args: Base launch args (headless, slow_mo)
+        browser_context_args: Base context args (video dir, viewport, ...)
+
+    Returns:
+        tuple: (browser_type, launch_args, context_args)
+    """
+    browser_type_name, launch_args, context_args = resolve_launch_settings(
+        browser_name, browser_type_launch_args, browser_context_args
+    )
+    return getattr(playwright, browser_type_name), launch_args, context_args
+
+
+def resolve_launch_settings(browser_name, browser_type_launch_args, browser_context_args):
+    """
+    Resolve the browser type name, launch args and context args for a browser name
+
+    Args:
+        browser_name: Browser name (chrome, msedge, firefox, webkit or chromium)
+        browser_type_launch_args: Base launch args (headless, slow_mo)
+        browser_context_args: Base context args (video dir, viewport, ...)
+
+    Returns:
+        tuple: (browser_type_name, launch_args, context_args)
+    """
+    if browser_name == "chrome":
+        browser_type_name = "chromium"
+        launch_args = {
+            "channel": "chrome",
+            **browser_type_launch_args,
+            "args": [
+                "--start-maximized"
+            ],
+        }
+        context_args = browser_context_args.copy()
+        context_args["viewport"] = None
+
+    elif browser_name == "msedge":
+        browser_type_name = "chromium"
+        launch_args = {
+            "channel": "msedge",
+            **browser_type_launch_args,
+            "args": [
+                "--start-maximized",
+                "--window-size=1920,1080",
+                "--disable-web-security",
+                "--no-proxy-server"
+            ],
+        }
+        context_args = browser_context_args.copy()
+        context_args["viewport"] = None
+
+    elif browser_name == "firefox":
+        browser_type_name = "firefox"
+        launch_args = {
+            **browser_type_launch_args,
+            "args": ["--kiosk"],
+        }
+        context_args = browser_context_args.copy()
+        context_args["viewport"] = None
+
+    elif browser_name == "webkit":
+        browser_type_name = "webkit"
+        launch_args = browser_type_launch_args
+        context_args = browser_context_args.copy()
+        context_args["viewport"] = {"width": 1280, "height": 680}
+
+    else:
+        # default chromium launch
+        browser_type_name = "chromium"
+        launch_args = browser_type_launch_args
+        context_args = browser_context_args.copy()
+
+    return browser_type_name, launch_args, context_args
@@ -0,0 +1,253 @@
+"""
+Browser pool module spreading test contexts over Playwright browser servers, locally or on other hosts
+
+The servers listen on all interfaces (Playwright's launch-server takes no host), the unguessable
+path of their ws endpoint is their only protection: run them on trusted networks only.
+
+Usage:
+    python -m utils.browser_pool serve --count 4 [--browser chromium] [--port 9300]
+    python -m utils.browser_pool launch --count 4 [--ssh user@host1 --ssh user@host2] [--output browser-servers.txt]
+"""
+import argparse
+import logging
+import os
+import shlex
+import signal
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+from utils.browser_server import BrowserServer
+
+logger = logging.getLogger(__name__)
+
+
+def read_endpoints(value):
+    """
+    Read browser server endpoints from a comma separated list or a file with one endpoint per line
+
+    Args:
+        value: e.g. "ws://10.0.0.5:9300/abc,ws://10.0.0.6:9300/def" or "browser-servers.txt"
+
+    Returns:
+        list[str]: ws endpoints
+    """
+    if not value:
+        return []
+    if os.path.isfile(value):
+        with open(value, "r", encoding="utf-8") as file:
+            return [line.strip() for line in file if line.strip().startswith("ws")]
+    return [endpoint.strip() for endpoint in value.split(",") if endpoint.strip()]
+
+
+def is_reachable(endpoint, timeout=2):
+    """Check that the host and port of a ws endpoint accept connections"""
+    url = urlsplit(endpoint)
+    try:
+        with socket.create_connection((url.hostname, url.port or 80), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+class PoolMember:
+    """One browser server of the pool and the browser connected to it"""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.browser = None
+        self.failures = 0
+        self.retry_at = 0
+        self.remote = endpoint is not None
+
+    def is_connected(self):
+        return self.browser is not None and self.browser.is_connected()
+
+
+class RemoteBrowserPool:
+    """Connects to browser servers and hands them out in turn, launching locally if none is healthy"""
+
+    def __init__(self, browser_type, endpoints, launch_args, retry_interval=30):
+        """
+        Args:
+            browser_type: Playwright BrowserType of the servers
+            endpoints: ws endpoints of the browser servers
+            launch_args: Launch args of the local fallback browser (slow_mo also applies to connections)
+            retry_interval: Seconds before an unhealthy server is tried again
+        """
+        self.browser_type = browser_type
+        self.launch_args = launch_args
+        self.retry_interval = retry_interval
+        self.members = [PoolMember(endpoint) for endpoint in endpoints]
+        self.local = PoolMember(None)
+        self.stats = {"acquired": 0, "reconnects": 0, "fallbacks": 0}
+        self._next = 0
+
+        # Workers of a parallel run start their round at different servers
+        worker = os.getenv("PYTEST_XDIST_WORKER", "gw0")
+        offset = int(worker[2:]) if worker[2:].isdigit() else 0
+        if self.members:
+            offset %= len(self.members)
+            self.members = self.members[offset:] + self.members[:offset]
+
+    def _connect(self, member):
+        """Connect to a member's server, returning False and marking it unhealthy on failure"""
+        if member.is_connected():
+            return True
+        if member.browser is not None:
+            self.stats["reconnects"] += 1
+            logger.warning(f"Browser server {member.endpoint} disconnected, reconnecting")
+        try:
+            if not is_reachable(member.endpoint):
+                raise ConnectionError("port not reachable")
+            member.browser = self.browser_type.connect(member.endpoint, slow_mo=self.launch_args.get("slow_mo"))
+            member.failures = 0
+            return True
+        except Exception as e:
+            member.browser = None
+            member.failures += 1
+            member.retry_at = time.monotonic() + self.retry_interval
+            logger.error(f"Browser server {member.endpoint} is unhealthy: {e}")
+            return False
+
+    def acquire(self):
+        """
+        Get the next healthy server in turn
+
+        The pool only knows its own contexts, which are released before the next test starts,
+        and workers of a parallel run do not share their counts, so servers are taken in turn
+        from each worker's own starting point instead of by load.
+
+        Returns:
+            PoolMember: Member whose browser the caller opens its context in
+        """
+        now = time.monotonic()
+        for step in range(len(self.members)):
+            index = (self._next + step) % len(self.members)
+            member = self.members[index]
+            if member.retry_at <= now and self._connect(member):
+                self._next = index + 1
+                self.stats["acquired"] += 1
+                return member
+
+        if not self.local.is_connected():
+            logger.warning("No healthy browser server, launching the browser locally")
+            self.local.browser = self.browser_type.launch(**self.launch_args)
+        self.stats["fallbacks"] += 1
+        return self.local
+
+    def close(self):
+        """Disconnect from every server and close the local fallback browser"""
+        for member in self.members + [self.local]:
+            if member.browser is not None:
+                try:
+                    member.browser.close()
+                except Exception as e:
+                    logger.error(f"Failed to close browser of {member.endpoint or 'local fallback'}: {e}")
+                member.browser = None
+
+
+def serve(browser_type_name, count, port, advertise=None, headless=True):
+    """
+    Start browser servers and print their endpoints, one per line
+
+    Args:
+        browser_type_name: Playwright browser type (chromium, firefox or webkit)
+        count: Number of servers
+        port: Port of the first server, the others use the following ports
+        advertise: Host name printed in the endpoints instead of localhost
+
+    Returns:
+        list[BrowserServer]: Running servers
+    """
+    servers = []
+    for index in range(count):
+        server = BrowserServer(browser_type_name, {"headless": headless, "port": port + index})
+        try:
+            endpoint = urlsplit(server.start())
+        except Exception:
+            for started in servers:
+                started.stop()
+            raise
+        if advertise:
+            endpoint = endpoint._replace(netloc=f"{advertise}:{endpoint.port}")
+        server.ws_endpoint = urlunsplit(endpoint)
+        servers.append(server)
+        print(server.ws_endpoint, flush=True)
+    return servers
+
+
+def _wait_for_interrupt():
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while True:
+            time.sleep(1)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Start Playwright browser servers for the remote browser pool")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("serve", "launch"):
+        command = commands.add_parser(name)
+        command.add_argument("--count", type=int, default=2, help="Browser servers per host")
+        command.add_argument("--browser", default="chromium", help="chromium, firefox or webkit")
+        command.add_argument("--port", type=int, default=9300, help="Port of the first server, listening on all interfaces")
+        command.add_argument("--headless", default="true")
+    commands.choices["serve"].add_argument("--advertise", help="Host name written in the endpoints")
+    launch = commands.choices["launch"]
+    launch.add_argument("--ssh", action="append", default=[], help="user@host to start servers on, repeatable")
+    launch.add_argument("--remote_dir", default=".", help="Checkout of this repository on the ssh hosts")
+    launch.add_argument("--remote_python", default="python", help="Python interpreter on the ssh hosts")
+    launch.add_argument("--output", default="browser-servers.txt", help="File the endpoints are written to")
+    args = parser.parse_args()
+    headless = args.headless.lower() == "true"
+
+    if args.command == "serve":
+        servers = serve(args.browser, args.count, args.port, args.advertise, headless)
+        _wait_for_interrupt()
+        for server in servers:
+            server.stop()
+        return
+
+    servers, remotes, endpoints = [], [], []
+    try:
+        if args.ssh:
+            for target in args.ssh:
+                remote_command = (
+                    f"cd {shlex.quote(args.remote_dir)} && {args.remote_python} -m utils.browser_pool serve "
+                    f"--count {args.count} --browser {args.browser} --port {args.port} "
+                    f"--headless {args.headless} --advertise {target.rsplit('@', 1)[-1]}"
+                )
+                # -tt ties the remote servers to the ssh session, they stop when it ends
+                process = subprocess.Popen(["ssh", "-tt", target, remote_command], stdout=subprocess.PIPE, text=True)
+                remotes.append(process)
+                host_endpoints = []
+                for line in process.stdout:
+                    if line.strip().startswith("ws"):
+                        host_endpoints.append(line.strip())
+                    if len(host_endpoints) == args.count:
+                        break
+                if len(host_endpoints) < args.count:
+                    logger.error(f"Only {len(host_endpoints)} of {args.count} browser servers started on {target}")
+                endpoints += host_endpoints
+        else:
+            servers = serve(args.browser, args.count, args.port, headless=headless)
+            endpoints = [server.ws_endpoint for server in servers]
+
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write("\n".join(endpoints) + "\n")
+        print(f"Wrote {len(endpoints)} endpoints to {args.output}, run the tests with --browser_servers={args.output}")
+        _wait_for_interrupt()
+    finally:
+        for server in servers:
+            server.stop()
+        for process in remotes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Browser server module running Playwright browsers in a separate driver process
+"""
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import playwright
+from playwright._impl._driver import get_driver_env
+
+logger = logging.getLogger(__name__)
+
+# Launch args understood by BrowserType.launchServer, mapped to their camelCase names
+SERVER_OPTION_NAMES = {
+    "headless": "headless",
+    "channel": "channel",
+    "args": "args",
+    "executable_path": "executablePath",
+    "port": "port",
+}
+
+
+def driver_command(*args):
+    """
+    Build a command running the Playwright CLI with the bundled Node.js
+
+    Node is started directly rather than through the driver's shell wrapper,
+    so terminating the process also shuts down the browsers it launched.
+
+    Args:
+        *args: CLI arguments, e.g. "launch-server", "--browser", "chromium"
+
+    Returns:
+        list[str]: Command line for subprocess
+    """
+    driver_path = Path(playwright.__file__).parent / "driver"
+    node_name = "node.exe" if sys.platform == "win32" else "node"
+    node_path = os.getenv("PLAYWRIGHT_NODEJS_PATH", str(driver_path / node_name))
+    return [node_path, str(driver_path / "package" / "cli.js"), *args]
+
+
+class BrowserServer:
+    """Browser launched through `playwright launch-server`, reachable over a ws endpoint"""
+
+    def __init__(self, browser_type_name, launch_args):
+        """
+        Args:
+            browser_type_name: Playwright browser type (chromium, firefox or webkit)
+            launch_args: Launch args as passed to BrowserType.launch
+        """
+        self.browser_type_name = browser_type_name
+        self.launch_args = launch_args
+        self.process = None
+        self.ws_endpoint = None
+
+    def start(self):
+        """
+        Start the server process and wait for its ws endpoint
+
+        Returns:
+            str: ws endpoint to pass to BrowserType.connect
+        """
+        options = {
+            SERVER_OPTION_NAMES[key]: value
+            for key, value in self.launch_args.items()
+            if key in SERVER_OPTION_NAMES
+        }
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as config_file:
+            json.dump(options, config_file)
+
+        try:
+            self.process = subprocess.Popen(
+                driver_command("launch-server", "--browser", self.browser_type_name, "--config", config_file.name),
+                env=get_driver_env(),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+            output = []
+            for line in self.process.stdout:
+                line = line.strip()
+                if line.startswith("ws://"):
+                    self.ws_endpoint = line
+                    break
+                output.append(line)
+        finally:
+            os.remove(config_file.name)
+
+        if not self.ws_endpoint:
+            self.stop()
+            raise RuntimeError(f"Browser server for {self.browser_type_name} did not start: {' '.join(output)}")
+
+        # Keep draining the output so the server never blocks on a full pipe
+        threading.Thread(target=self._drain_output, daemon=True).start()
+        logger.info(f"Browser server for {self.browser_type_name} listening on {self.ws_endpoint}")
+        return self.ws_endpoint
+
+    def _drain_output(self):
+        for line in self.process.stdout:
+            logger.debug(f"Browser server: {line.rstrip()}")
+
+    def is_running(self):
+        """Check if the server process is still alive"""
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self):
+        """Terminate the server process and the browser it launched"""
+        if not self.is_running():
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class BrowserPrelauncher:
+    """Starts a browser server in a background thread while the session collects tests"""
+
+    def __init__(self, name, browser_type_name, launch_args):
+        """
+        Args:
+            name: Configured browser name (chrome, msedge, firefox, webkit or chromium)
+            browser_type_name: Playwright browser type (chromium, firefox or webkit)
+            launch_args: Launch args as passed to BrowserType.launch
+        """
+        self.name = name
+        self.server = BrowserServer(browser_type_name, launch_args)
+        self.error = None
+        self.launch_time = None
+        self._thread = threading.Thread(target=self._run, name="browser-prelaunch", daemon=True)
+
+    def start(self):
+        """Start launching the browser in the background"""
+        self._thread.start()
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            self.server.start()
+        except Exception as e:
+            self.error = e
+        self.launch_time = time.perf_counter() - start
+
+    def wait(self, timeout=None):
+        """
+        Wait for the background launch to finish
+
+        Args:
+            timeout: Maximum seconds to wait (default: no limit)
+
+        Returns:
+            str: ws endpoint, or None if the launch failed
+        """
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error("Browser pre-launch did not finish in time")
+            return None
+        if self.error:
+            logger.error(f"Browser pre-launch failed: {self.error}")
+            return None
+        return self.server.ws_endpoint
+
+    def stop(self, timeout=120):
+        """Wait for a pending launch and shut the browser server down"""
+        self._thread.join(timeout)
+        self.server.stop()
@@ -0,0 +1,72 @@
+"""
+Collection profile module measuring the import and collection time of every test module
+"""
+import sys
+import time
+
+import pytest
+
+
+class CollectProfiler:
+    """Pytest plugin timing the import and the collection of each test module and the modules each import pulls in"""
+
+    def __init__(self, conftest_import=None):
+        """
+        Args:
+            conftest_import: Seconds the root conftest took to import, measured before the plugin existed
+        """
+        self.modules = {}
+        self.conftest_import = conftest_import
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_make_collect_report(self, collector):
+        if not isinstance(collector, (pytest.Module, pytest.Class)) or isinstance(collector, pytest.Package):
+            yield
+            return
+
+        loaded = set(sys.modules)
+        start = time.perf_counter()
+        if isinstance(collector, pytest.Module):
+            try:
+                # Import first so the time spent in the import is told apart from collecting the tests
+                collector.obj
+            except Exception:
+                pass
+        imported = time.perf_counter()
+        yield
+
+        # Classes, and the parametrization of their tests, count for their module
+        entry = self.modules.setdefault(collector.nodeid.split("::")[0], {"import": 0, "collect": 0, "tests": 0, "new_modules": set()})
+        entry["import"] += imported - start
+        entry["collect"] += time.perf_counter() - imported
+        # The test module itself included
+        entry["new_modules"] |= set(sys.modules) - loaded
+
+    def pytest_collection_finish(self, session):
+        for item in session.items:
+            entry = self.modules.get(item.nodeid.split("::")[0])
+            if entry:
+                entry["tests"] += 1
+
+    def report_lines(self):
+        """
+        Format the profile for the terminal, slowest module first
+
+        Returns:
+            list[str]: Header and one line per test module
+        """
+        lines = [f"{'module':<48}{'import':>10}{'collect':>10}{'tests':>7}  new imports"]
+        if self.conftest_import is not None:
+            lines.append(f"{'conftest.py':<48}{self.conftest_import * 1000:>8.0f}ms{'':>10}{'':>7}")
+        for nodeid, entry in sorted(self.modules.items(), key=lambda item: -(item[1]["import"] + item[1]["collect"])):
+            packages = sorted({name.split(".")[0] for name in entry["new_modules"]})
+            lines.append(
+                f"{nodeid:<48}{entry['import'] * 1000:>8.0f}ms{entry['collect'] * 1000:>8.0f}ms{entry['tests']:>7}  "
+                f"{len(entry['new_modules'])} ({', '.join(packages[:6])}{', ...' if len(packages) > 6 else ''})"
+            )
+        return lines
+
+    def pytest_terminal_summary(self, terminalreporter):
+        terminalreporter.section("collection profile")
+        for line in self.report_lines():
+            terminalreporter.write_line(line)
@@ -6,8 +6,16 @@ import os
 import random
 import string
 import csv
+from functools import lru_cache
 from pathlib import Path
 
+
+@lru_cache(maxsize=None)
+def _read_csv(abs_path):
+    with open(abs_path, mode='r', newline='', encoding='utf-8') as csvfile:
+        return tuple(csv.DictReader(csvfile))
+
+
 class DataHelper:
     """Data Helper class for test data management"""
 
@@ -29,6 +37,19 @@ class DataHelper:
             data = [row for row in reader]
         return data
     
+    @staticmethod
+    def read_csv_rows(file_path):
+        """
+        Read the rows of a CSV file, parsing each file once per session
+
+        Args:
+            file_path (str): Path to the CSV file relative to project root.
+
+        Returns:
+            list[dict]: Copies of the rows, safe to modify in a test.
+        """
+        return [dict(row) for row in _read_csv(str(Path(file_path).resolve()))]
+
     @staticmethod
     def load_test_data(file_path):
         """
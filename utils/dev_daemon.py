@@ -0,0 +1,283 @@
+"""
+Dev daemon module keeping a warm, logged-in browser between pytest invocations on a developer machine
+
+Usage:
+    python -m utils.dev_daemon start [--browser chromium] [--headless true]
+    python -m utils.dev_daemon status
+    python -m utils.dev_daemon stop
+"""
+import argparse
+import configparser
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from utils.browser_factory import resolve_launch_settings
+from utils.browser_pool import is_reachable
+from utils.browser_server import BrowserServer
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "daemon.json"
+STORAGE_STATE_FILE = "storage-state.json"
+LOG_FILE = "daemon.log"
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except (OSError, TypeError):
+        return False
+    return True
+
+
+def read_state(state_dir):
+    """
+    Read the state of a running daemon
+
+    Args:
+        state_dir: Directory of the daemon's files
+
+    Returns:
+        dict: pid, ws_endpoint, browser, headless, user, started and dir, None when no daemon is running
+        or its browser server does not answer
+    """
+    path = os.path.join(state_dir, STATE_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not _pid_alive(state.get("pid")) or not is_reachable(state["ws_endpoint"], timeout=1):
+        return None
+    return state
+
+
+def save_storage_state(state, context):
+    """Store the cookies of a context logged in by a test, so the next runs skip the UI login"""
+    path = os.path.join(state["dir"], STORAGE_STATE_FILE)
+    context.storage_state(path=path)
+    logger.info(f"Updated the dev daemon's login state: {path}")
+
+
+def load_storage_state(state):
+    """Storage state of the daemon's logged-in user, None before the first login"""
+    path = os.path.join(state["dir"], STORAGE_STATE_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+class DevDaemon:
+    """Keeps a browser server running, logged in once and restarted if it dies"""
+
+    def __init__(self, state_dir, browser_name, launch_args, user, check_interval=10, login_max_age=3600, login_retry=300):
+        """
+        Args:
+            state_dir: Directory the state, login state and log are written to
+            browser_name: Configured browser name (chrome, msedge, firefox, webkit or chromium)
+            launch_args: Base launch args (headless, slow_mo)
+            user: Credentials logged in with
+            check_interval: Seconds between health checks of the browser server
+            login_max_age: Seconds after which the login state is refreshed
+            login_retry: Seconds before a failed login is tried again
+        """
+        self.state_dir = state_dir
+        self.browser_name = browser_name
+        self.browser_type_name, self.launch_args, _ = resolve_launch_settings(browser_name, launch_args, {})
+        self.user = user
+        self.check_interval = check_interval
+        self.login_max_age = login_max_age
+        self.login_retry = login_retry
+        self.server = None
+        self._next_login_attempt = 0
+        self._stopping = False
+
+    def _start_server(self):
+        self.server = BrowserServer(self.browser_type_name, self.launch_args)
+        self.server.start()
+        self._write_state()
+
+    def _write_state(self):
+        state = {
+            "pid": os.getpid(),
+            "ws_endpoint": self.server.ws_endpoint,
+            "browser": self.browser_name,
+            "headless": self.launch_args.get("headless", False),
+            "user": self.user["username"],
+            "started": time.time(),
+            "dir": os.path.abspath(self.state_dir),
+        }
+        path = os.path.join(self.state_dir, STATE_FILE)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(state, file, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+    def _login(self):
+        """Log in through the UI in a context of the daemon's own and keep its storage state"""
+        # Imported here: the page objects import Playwright, which the CLI commands do not need
+        from playwright.sync_api import sync_playwright
+        from pages.home_page import HomePage
+        from pages.login_page import LoginPage
+
+        with sync_playwright() as playwright:
+            browser = getattr(playwright, self.browser_type_name).connect(self.server.ws_endpoint)
+            try:
+                page = browser.new_context().new_page()
+                login_page = LoginPage(page)
+                login_page.navigate_to_login()
+                login_page.perform_login(self.user["username"], self.user["password"])
+                if not HomePage(page).is_logged_in():
+                    raise RuntimeError("the home page was not shown after the login")
+                page.context.storage_state(path=os.path.join(self.state_dir, STORAGE_STATE_FILE))
+                logger.info(f"Logged in as {self.user['username']}")
+            finally:
+                browser.close()
+
+    def _login_age(self):
+        path = os.path.join(self.state_dir, STORAGE_STATE_FILE)
+        return time.time() - os.path.getmtime(path) if os.path.exists(path) else None
+
+    def run(self):
+        """Serve until SIGTERM, restarting a dead browser server and refreshing an old login"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        self._start_server()
+        try:
+            while not self._stopping:
+                if not self.server.is_running():
+                    logger.warning("Browser server died, restarting it")
+                    self._start_server()
+                age = self._login_age()
+                if (age is None or age > self.login_max_age) and time.time() >= self._next_login_attempt:
+                    try:
+                        self._login()
+                    except Exception as e:
+                        # Meanwhile the tests log in through the UI and hand their login state back
+                        logger.error(f"Login failed, retrying in {self.login_retry}s: {e}")
+                        self._next_login_attempt = time.time() + self.login_retry
+                self._sleep(self.check_interval)
+        finally:
+            self.server.stop()
+            for name in (STATE_FILE, STORAGE_STATE_FILE):
+                path = os.path.join(self.state_dir, name)
+                if os.path.exists(path):
+                    os.remove(path)
+            logger.info("Dev daemon stopped")
+
+    def _request_stop(self, *_):
+        self._stopping = True
+
+    def _sleep(self, seconds):
+        end = time.monotonic() + seconds
+        while not self._stopping and time.monotonic() < end:
+            time.sleep(0.2)
+
+
+def start(state_dir, args, timeout=120):
+    """
+    Start the daemon in the background and wait for its browser server
+
+    Returns:
+        dict: State of the running daemon, None if it did not come up
+    """
+    state = read_state(state_dir)
+    if state:
+        print(f"Dev daemon already running (pid {state['pid']}) at {state['ws_endpoint']}")
+        return state
+    os.makedirs(state_dir, exist_ok=True)
+    with open(os.path.join(state_dir, LOG_FILE), "a", encoding="utf-8") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "utils.dev_daemon", "run", "--browser", args.browser, "--headless", args.headless],
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and process.poll() is None:
+        state = read_state(state_dir)
+        if state and state["pid"] == process.pid:
+            print(f"Dev daemon started (pid {process.pid}), {state['browser']} at {state['ws_endpoint']}")
+            return state
+        time.sleep(0.5)
+    print(f"Dev daemon did not start, see {os.path.join(state_dir, LOG_FILE)}")
+    if process.poll() is None:
+        process.terminate()
+    return None
+
+
+def stop(state_dir, timeout=30):
+    """Stop the running daemon, returning False if none was running"""
+    state = read_state(state_dir)
+    if not state:
+        print("Dev daemon is not running")
+        return False
+    os.kill(state["pid"], signal.SIGTERM)
+    deadline = time.monotonic() + timeout
+    while _pid_alive(state["pid"]) and time.monotonic() < deadline:
+        time.sleep(0.2)
+    print(f"Dev daemon stopped (pid {state['pid']})")
+    return True
+
+
+def status(state_dir):
+    """Print whether the daemon runs, its browser and the age of its login"""
+    state = read_state(state_dir)
+    if not state:
+        print("Dev daemon is not running")
+        return None
+    print(f"Dev daemon running (pid {state['pid']}) for {(time.time() - state['started']) / 60:.0f} min")
+    print(f"  browser:  {state['browser']} at {state['ws_endpoint']}")
+    login = os.path.join(state["dir"], STORAGE_STATE_FILE)
+    if os.path.exists(login):
+        print(f"  login:    {state['user']}, {(time.time() - os.path.getmtime(login)) / 60:.0f} min old")
+    else:
+        print("  login:    none yet, tests log in through the UI")
+    return state
+
+
+def main():
+    config = configparser.ConfigParser()
+    config.read("config.properties")
+    state_dir = config.get("default", "daemon.dir", fallback=".dev-daemon")
+
+    parser = argparse.ArgumentParser(description="Keep a warm, logged-in browser for repeated local test runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("start", "run"):
+        command = commands.add_parser(name)
+        command.add_argument("--browser", default=config.get("default", "browser", fallback="chromium").lower())
+        command.add_argument("--headless", default=config.get("default", "headless", fallback="false").lower())
+    commands.add_parser("stop")
+    commands.add_parser("status")
+    args = parser.parse_args()
+
+    if args.command == "start":
+        sys.exit(0 if start(state_dir, args) else 1)
+    if args.command == "stop":
+        stop(state_dir)
+    elif args.command == "status":
+        status(state_dir)
+    else:
+        from data.user_credentials import valid_user
+
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        DevDaemon(
+            state_dir,
+            args.browser,
+            {"headless": args.headless.lower() == "true"},
+            valid_user,
+            check_interval=config.getint("default", "daemon.check_interval", fallback=10),
+            login_max_age=config.getint("default", "daemon.login_max_age", fallback=3600),
+        ).run()
+
+
+if __name__ == "__main__":
+    main()
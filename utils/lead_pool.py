@@ -0,0 +1,107 @@
+"""
+Lead pool module creating test leads once per session and handing them out to tests
+"""
+import logging
+
+from pages.create_lead_page import CreateLeadPage
+from pages.home_page import HomePage
+from pages.leads_page import LeadsPage
+from pages.login_page import LoginPage
+from pages.my_home_page import MyHomePage
+from pages.view_lead_page import ViewLeadPage
+from utils.data_helper import DataHelper
+
+logger = logging.getLogger(__name__)
+
+
+class LeadPool:
+    """Pool of leads shared by read-only tests, with exclusive leads for tests that modify them"""
+
+    def __init__(self, new_context, user, size=1):
+        """
+        Args:
+            new_context: Callable returning a new browser context, used to create and delete the leads
+            user: Credentials of the user owning the leads
+            size: Number of leads created on the first checkout
+        """
+        self.new_context = new_context
+        self.user = user
+        self.size = size
+        self.stats = {"hits": 0, "misses": 0, "created": 0, "deleted": 0}
+        self._available = []
+        self._checked_out = []
+        self._exclusive = []
+        self._page = None
+
+    def _pool_page(self):
+        """Log in once in a context of the pool's own, kept out of the tests' traces and videos"""
+        if self._page is None:
+            page = self.new_context().new_page()
+            # Deleting a lead asks for confirmation
+            page.on("dialog", lambda dialog: dialog.accept())
+            login_page = LoginPage(page)
+            login_page.navigate_to_login()
+            login_page.perform_login(self.user["username"], self.user["password"])
+            HomePage(page).click_crm_sfa_link()
+            self._page = page
+        return self._page
+
+    def _create(self):
+        page = self._pool_page()
+        lead = DataHelper.generate_test_lead_data()
+        MyHomePage(page).click_leads_tab()
+        LeadsPage(page).click_create_lead()
+        CreateLeadPage(page).create_new_lead(lead)
+        page.wait_for_url("**/viewLead**")
+        lead["id"] = ViewLeadPage(page).get_lead_id()
+        self.stats["created"] += 1
+        logger.info(f"Created pooled lead {lead['id']}: {lead['firstName']} {lead['lastName']}")
+        return lead
+
+    def checkout(self, exclusive=False):
+        """
+        Take a lead from the pool, creating the first batch on the first call
+
+        Args:
+            exclusive: The test modifies the lead, it is never handed to another test
+
+        Returns:
+            dict: Lead data with its "id"
+        """
+        if not self.stats["created"]:
+            self._available.extend(self._create() for _ in range(self.size))
+
+        if self._available:
+            lead = self._available.pop(0)
+            self.stats["hits"] += 1
+        else:
+            lead = self._create()
+            self.stats["misses"] += 1
+
+        (self._exclusive if exclusive else self._checked_out).append(lead)
+        return lead
+
+    def release(self, lead):
+        """Give a lead back after the test; exclusive leads stay out of the pool until cleanup"""
+        if lead in self._checked_out:
+            self._checked_out.remove(lead)
+            self._available.append(lead)
+
+    def close(self):
+        """Delete every lead created by the pool and close its context"""
+        if self._page is None:
+            return
+        view_lead_page = ViewLeadPage(self._page)
+        for lead in self._available + self._checked_out + self._exclusive:
+            try:
+                view_lead_page.open_lead(lead["id"])
+                view_lead_page.click_delete()
+                self._page.wait_for_load_state()
+                self.stats["deleted"] += 1
+            except Exception as e:
+                logger.error(f"Failed to delete pooled lead {lead['id']}: {e}")
+        try:
+            self._page.context.close()
+        except Exception as e:
+            logger.error(f"Failed to close lead pool context: {e}")
+        self._page = None
@@ -5,9 +5,12 @@ import logging
 import os
 from datetime import datetime
 
+# Log file of this process, set by the first setup_logger call
+_log_file = None
+
 def setup_logger(log_level=logging.INFO):
     """
-    Setup and configure logger
+    Setup and configure logger, once per process
     
     Args:
         log_level: Logging level (default: INFO)
@@ -15,6 +18,10 @@ def setup_logger(log_level=logging.INFO):
     Returns:
         Logger: Configured logger instance
     """
+    global _log_file
+    if _log_file:
+        return logging.getLogger()
+
     # Create logs directory if it doesn't exist
     log_dir = os.path.join(os.getcwd(), "logs")
     if not os.path.exists(log_dir):
@@ -23,6 +30,7 @@ def setup_logger(log_level=logging.INFO):
     # Create log file with timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_file = os.path.join(log_dir, f"test_run_{timestamp}.log")
+    _log_file = log_file
     
     # Configure logging
     logging.basicConfig(
@@ -0,0 +1,180 @@
+"""
+Performance budget module measuring the application's own speed from the page objects and keeping it across runs
+"""
+import json
+import logging
+import os
+import weakref
+
+from utils.trace_analyzer import percentile
+
+logger = logging.getLogger(__name__)
+
+# Observers of the buffered Web Vitals entries, installed once per document
+OBSERVER_SCRIPT = """
+(() => {
+    if (window.__perfBudget) return;
+    const state = window.__perfBudget = {lcp: 0, cls: 0, longTasks: []};
+    const observe = (type, callback) => {
+        try {
+            new PerformanceObserver(list => list.getEntries().forEach(callback)).observe({type, buffered: true});
+        } catch (e) {}
+    };
+    observe("largest-contentful-paint", entry => { state.lcp = entry.startTime; });
+    observe("layout-shift", entry => { if (!entry.hadRecentInput) state.cls += entry.value; });
+    observe("longtask", entry => { state.longTasks.push([entry.startTime, entry.duration]); });
+})()
+"""
+
+MARK_SCRIPT = "() => [performance.timeOrigin, performance.now()]"
+
+# Metrics of the document since the mark; everything when the action loaded a new document
+COLLECT_SCRIPT = """
+([origin, since]) => {
+    const state = window.__perfBudget || {longTasks: []};
+    const supported = PerformanceObserver.supportedEntryTypes || [];
+    const navigated = performance.timeOrigin !== origin;
+    if (navigated) since = 0;
+    const resources = performance.getEntriesByType("resource").filter(entry => entry.startTime >= since);
+    const metrics = {
+        resources: resources.length,
+        transfer_kb: resources.reduce((sum, entry) => sum + (entry.transferSize || 0), 0) / 1024,
+    };
+    if (supported.includes("longtask")) {
+        const tasks = state.longTasks.filter(([start]) => start >= since);
+        metrics.long_tasks = tasks.length;
+        metrics.long_task_ms = tasks.reduce((sum, [, duration]) => sum + duration, 0);
+    }
+    if (supported.includes("layout-shift")) metrics.cls = state.cls;
+    if (!since) {
+        const navigation = performance.getEntriesByType("navigation")[0];
+        if (navigation) {
+            metrics.ttfb = navigation.responseStart;
+            metrics.dom_content_loaded = navigation.domContentLoadedEventEnd;
+            if (navigation.loadEventEnd) metrics.load = navigation.loadEventEnd;
+        }
+        if (supported.includes("largest-contentful-paint") && state.lcp) metrics.lcp = state.lcp;
+    }
+    return metrics;
+}
+"""
+
+
+class BudgetExceeded(AssertionError):
+    """A page action was slower than its performance budget"""
+
+
+class PerfRecorder:
+    """Collects Navigation Timing, resource timing and Web Vitals per page action and checks them against budgets"""
+
+    # Recorder used by the page objects, None when performance budgets are off
+    active = None
+
+    def __init__(self, file_path, mode="warn", max_samples=200):
+        """
+        Args:
+            file_path: JSON file keeping the metrics per page action across runs
+            mode: "warn" logs exceeded budgets, "fail" raises BudgetExceeded
+            max_samples: Values kept per page action and metric, the oldest are dropped
+        """
+        self.file_path = file_path
+        self.mode = mode
+        self.max_samples = max_samples
+        self.history = self._load()
+        self.run = {}
+        self.violations = []
+        # Budgets of the running test: {"FindLeadsPage.find_leads": {"duration": 2000}}
+        self.test_budgets = {}
+        self._pages = weakref.WeakSet()
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return {}
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable performance history {self.file_path}: {e}")
+            return {}
+
+    def install(self, page):
+        """Observe the Web Vitals of the page's current and future documents"""
+        if page in self._pages:
+            return
+        self._pages.add(page)
+        page.add_init_script(OBSERVER_SCRIPT)
+        try:
+            page.evaluate(OBSERVER_SCRIPT)
+        except Exception as e:
+            logger.debug(f"Could not observe the current document: {e}")
+
+    def mark(self, page):
+        """Position in the page's timeline an action is measured from"""
+        try:
+            return page.evaluate(MARK_SCRIPT)
+        except Exception:
+            return [None, 0]
+
+    def collect(self, page, mark):
+        """
+        Read the metrics of a page since a mark
+
+        Args:
+            page: Playwright page
+            mark: Result of mark(), [None, 0] for everything since the navigation
+
+        Returns:
+            dict: Metric name to value; Web Vitals are missing on browsers without them
+        """
+        try:
+            return page.evaluate(COLLECT_SCRIPT, mark)
+        except Exception as e:
+            logger.warning(f"Could not collect performance metrics: {e}")
+            return {}
+
+    def check(self, key, metrics, budgets):
+        """
+        Record the metrics of a page action and compare them with its budgets
+
+        Args:
+            key: "PageClass.action"
+            metrics: Metric name to value
+            budgets: Metric name to the highest accepted value
+
+        Returns:
+            list[str]: Exceeded budgets
+        """
+        run = self.run.setdefault(key, {})
+        history = self.history.setdefault(key, {})
+        for name, value in metrics.items():
+            run.setdefault(name, []).append(round(value, 3))
+            samples = history.setdefault(name, [])
+            samples.append(round(value, 3))
+            del samples[:-self.max_samples]
+
+        exceeded = [
+            f"{key} {name} {metrics[name]:.4g} > {limit}"
+            for name, limit in budgets.items()
+            if name in metrics and metrics[name] > limit
+        ]
+        self.violations.extend(exceeded)
+        return exceeded
+
+    def summary_lines(self):
+        """Median of every metric in this run, with the median of previous runs"""
+        lines = []
+        for key in sorted(self.run):
+            parts = []
+            for name, values in sorted(self.run[key].items()):
+                previous = self.history.get(key, {}).get(name, [])[:-len(values)]
+                part = f"{name} {percentile(values, 50):.4g}"
+                if previous:
+                    part += f" (was {percentile(previous, 50):.4g})"
+                parts.append(part)
+            lines.append(f"{key}: {', '.join(parts)}")
+        return lines
+
+    def save(self):
+        """Write the history back to disk"""
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            json.dump(self.history, file, indent=2, sort_keys=True)
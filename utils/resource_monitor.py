@@ -0,0 +1,187 @@
+"""
+Resource monitor module sampling the browser process tree from /proc
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def read_process_tree(root_pid):
+    """
+    Read RSS and CPU time of every descendant of a process from /proc
+
+    Args:
+        root_pid: Pid whose descendants are sampled (the pid itself is excluded)
+
+    Returns:
+        dict: {"processes": int, "rss": bytes, "cpu": seconds}
+    """
+    children = {}
+    stats = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as file:
+                stat = file.read()
+        except OSError:
+            # Process exited while scanning
+            continue
+        # The command name may contain spaces, fields start after its closing parenthesis
+        fields = stat[stat.rfind(")") + 2:].split()
+        pid = int(entry)
+        ppid = int(fields[1])
+        children.setdefault(ppid, []).append(pid)
+        stats[pid] = (int(fields[11]) + int(fields[12]), int(fields[21]))
+
+    total = {"processes": 0, "rss": 0, "cpu": 0.0}
+    pending = list(children.get(root_pid, []))
+    while pending:
+        pid = pending.pop()
+        cpu_ticks, rss_pages = stats[pid]
+        total["processes"] += 1
+        total["rss"] += rss_pages * PAGE_SIZE
+        total["cpu"] += cpu_ticks / CLOCK_TICKS
+        pending.extend(children.get(pid, []))
+    return total
+
+
+def count_browser_resources(browser):
+    """
+    Count the contexts and pages currently open in a browser
+
+    Returns:
+        dict: {"contexts": int, "pages": int}
+    """
+    try:
+        contexts = browser.contexts
+        return {"contexts": len(contexts), "pages": sum(len(context.pages) for context in contexts)}
+    except Exception as e:
+        logger.warning(f"Failed to count browser contexts: {e}")
+        return {"contexts": 0, "pages": 0}
+
+
+class ResourceMonitor:
+    """Samples the browser process tree while tests run and flags leaking tests"""
+
+    def __init__(self, interval=0.25, leak_threshold_mb=50):
+        """
+        Args:
+            interval: Seconds between two samples
+            leak_threshold_mb: RSS growth after teardown that flags a test as leaking
+        """
+        self.interval = interval
+        self.leak_threshold = leak_threshold_mb * 1024 * 1024
+        self.root_pid = os.getpid()
+        self.results = {}
+        self.unmonitored = []
+        self._current = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def is_supported():
+        """Check if /proc is available on this platform"""
+        return os.path.isdir("/proc/self")
+
+    def start_test(self, nodeid, browser):
+        """
+        Record the baseline of a test and start sampling
+
+        Args:
+            nodeid: Test node id
+            browser: Browser the test runs in
+        """
+        sample = read_process_tree(self.root_pid)
+        self._current = {
+            "nodeid": nodeid,
+            "baseline": {**sample, **count_browser_resources(browser)},
+            "peak_rss": sample["rss"],
+            "peak_processes": sample["processes"],
+        }
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="resource-monitor", daemon=True)
+        self._thread.start()
+
+    def skip_test(self, nodeid):
+        """Record a test whose browser runs outside pytest's process tree, e.g. on a browser server or the dev daemon"""
+        self.unmonitored.append(nodeid)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            sample = read_process_tree(self.root_pid)
+            self._current["peak_rss"] = max(self._current["peak_rss"], sample["rss"])
+            self._current["peak_processes"] = max(self._current["peak_processes"], sample["processes"])
+
+    def record_open(self, browser):
+        """Record the contexts and pages open at the end of the test body"""
+        if self._current:
+            self._current["open"] = count_browser_resources(browser)
+
+    def finish_test(self, browser):
+        """
+        Stop sampling after teardown and compare with the baseline
+
+        Args:
+            browser: Browser the test ran in
+
+        Returns:
+            dict: Resource usage of the test
+        """
+        if not self._current:
+            return None
+        self._stop.set()
+        self._thread.join()
+
+        current, self._current = self._current, None
+        baseline = current["baseline"]
+        final = {**read_process_tree(self.root_pid), **count_browser_resources(browser)}
+
+        leaks = []
+        if final["contexts"] > baseline["contexts"]:
+            leaks.append(f"{final['contexts'] - baseline['contexts']} context(s) left open")
+        if final["pages"] > baseline["pages"]:
+            leaks.append(f"{final['pages'] - baseline['pages']} page(s) left open")
+        if final["rss"] - baseline["rss"] > self.leak_threshold:
+            leaks.append(f"RSS grew by {(final['rss'] - baseline['rss']) / 1024 / 1024:.0f} MB")
+
+        result = {
+            "peak_rss_mb": round(max(current["peak_rss"], final["rss"]) / 1024 / 1024, 1),
+            "cpu_seconds": round(final["cpu"] - baseline["cpu"], 2),
+            "peak_processes": max(current["peak_processes"], final["processes"]),
+            "open_contexts": current.get("open", {}).get("contexts", 0),
+            "open_pages": current.get("open", {}).get("pages", 0),
+            "leaks": leaks,
+        }
+        self.results[current["nodeid"]] = result
+        if leaks:
+            logger.warning(f"Resources not released by {current['nodeid']}: {', '.join(leaks)}")
+        return result
+
+    def leaking_tests(self):
+        """Get the tests whose resources did not return to baseline"""
+        return {nodeid: result for nodeid, result in self.results.items() if result["leaks"]}
+
+    def write_report(self, file_path):
+        """Write the per-test resource usage of the run as JSON"""
+        report = {
+            "tests": self.results,
+            "summary": {
+                "tests": len(self.results),
+                "leaking_tests": len(self.leaking_tests()),
+                "max_peak_rss_mb": max((r["peak_rss_mb"] for r in self.results.values()), default=0),
+                "total_cpu_seconds": round(sum(r["cpu_seconds"] for r in self.results.values()), 2),
+                "unmonitored_tests": len(self.unmonitored),
+            },
+            # Their browser processes are not descendants of pytest and cannot be sampled
+            "unmonitored": self.unmonitored,
+        }
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
@@ -0,0 +1,138 @@
+"""
+Retry helper module for re-running flaky tests inside the same session
+"""
+import inspect
+import json
+import logging
+import os
+import time
+
+import pytest
+
+try:
+    from _pytest.runner import call_and_report
+except ImportError:
+    call_and_report = None
+
+logger = logging.getLogger(__name__)
+
+
+class FlakyHistory:
+    """Flake history stored in a local JSON file across runs"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.data = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return {}
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable flaky history {self.file_path}: {e}")
+            return {}
+
+    def record(self, nodeid, outcome):
+        """
+        Record the final outcome of a test
+
+        Args:
+            nodeid: Test node id
+            outcome: One of "passed", "flaky" or "failed"
+        """
+        entry = self.data.setdefault(nodeid, {"runs": 0, "passed": 0, "flaky": 0, "failed": 0})
+        entry["runs"] += 1
+        entry[outcome] += 1
+
+    def flake_rate(self, nodeid):
+        """
+        Get the share of runs in which a test only passed after a retry
+
+        Args:
+            nodeid: Test node id
+
+        Returns:
+            float: Flake rate between 0 and 1
+        """
+        entry = self.data.get(nodeid)
+        if not entry or not entry["runs"]:
+            return 0.0
+        return entry["flaky"] / entry["runs"]
+
+    def save(self):
+        """Write the history back to disk"""
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            json.dump(self.data, file, indent=2, sort_keys=True)
+
+
+def retries_supported():
+    """
+    Check the private pytest API the retries run the test phases with, as found in pytest 7
+
+    Returns:
+        bool: True when call_and_report(item, when, log, nextitem=...) and Function._initrequest exist
+    """
+    if call_and_report is None or not hasattr(pytest.Function, "_initrequest"):
+        return False
+    parameters = inspect.signature(call_and_report).parameters
+    return "log" in parameters and any(parameter.kind is inspect.Parameter.VAR_KEYWORD for parameter in parameters.values())
+
+
+def run_with_retries(item, nextitem, retries, backoff):
+    """
+    Run the setup/call/teardown phases of a test, retrying failed attempts
+
+    Intermediate attempts only tear down the test's own function-scoped
+    fixtures, so the session browser and everything above the test stays warm
+    for the retry.
+
+    Args:
+        item: Test item
+        nextitem: Next test item scheduled (None at the end of the session)
+        retries: Maximum number of retries after the first attempt
+        backoff: Base delay in seconds, doubled on every retry
+
+    Returns:
+        str: Final outcome, one of "passed", "flaky" or "failed"
+    """
+    for attempt in range(retries + 1):
+        item.execution_count = attempt + 1
+        # The reports of the previous attempt must not decide on this attempt's screenshot
+        for when in ("setup", "call", "teardown"):
+            if hasattr(item, f"rep_{when}"):
+                delattr(item, f"rep_{when}")
+        if not item._request:
+            item._initrequest()
+
+        reports = [call_and_report(item, "setup", log=False)]
+        if reports[0].passed:
+            reports.append(call_and_report(item, "call", log=False))
+        failed = any(report.failed for report in reports)
+        will_retry = failed and attempt < retries and not item.session.shouldstop
+
+        # Keep every collector above the test on the setup stack while retrying
+        teardown_target = item.parent if will_retry else nextitem
+        reports.append(call_and_report(item, "teardown", log=False, nextitem=teardown_target))
+        item._request = False
+        item.funcargs = None
+
+        if will_retry:
+            for report in reports:
+                if report.failed:
+                    report.outcome = "rerun"
+                item.ihook.pytest_runtest_logreport(report=report)
+            delay = backoff * (2 ** attempt)
+            logger.warning(f"Retrying {item.nodeid} (attempt {attempt + 2}/{retries + 1}) in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        flaky = not failed and attempt > 0
+        for report in reports:
+            if flaky and report.when == "call":
+                report.flaky = True
+            item.ihook.pytest_runtest_logreport(report=report)
+        if failed:
+            return "failed"
+        return "flaky" if flaky else "passed"
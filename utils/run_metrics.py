@@ -0,0 +1,165 @@
+"""
+Run metrics module timing the phases of every test and exporting them with the session counters as OpenMetrics and JSON
+"""
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "playwright"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class RunMetrics:
+    """Pytest plugin collecting phase timings per test and session counters, written as OpenMetrics and JSON"""
+
+    def __init__(self, output_dir, stream=False, startup_phases=None):
+        """
+        Args:
+            output_dir: Directory the metrics files are written to
+            stream: Rewrite the files after every test instead of once at the end of the session
+            startup_phases: Durations of the session start phases in seconds, filled while the session starts
+        """
+        self.output_dir = output_dir
+        self.stream = stream
+        self.started = time.time()
+        # End of the session, only known in advance for merged metrics
+        self.finished = None
+        # {nodeid: {phase: seconds}}, summed over the attempts of retried tests
+        self.tests = {}
+        self.outcomes = {}
+        self.retries = 0
+        self.artifact_bytes = {}
+        self.startup_phases = startup_phases if startup_phases is not None else {}
+        self._pending = {}
+
+        # Parallel workers write files of their own
+        worker = os.getenv("PYTEST_XDIST_WORKER")
+        self.file_stem = f"run-metrics-{worker}" if worker else "run-metrics"
+
+    @contextmanager
+    def phase(self, nodeid, name):
+        """Time a block as a phase of a test"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(nodeid, name, time.perf_counter() - start)
+
+    def record_phase(self, nodeid, name, seconds):
+        """Add a phase duration measured elsewhere"""
+        phases = self.tests.setdefault(nodeid, {})
+        phases[name] = phases.get(name, 0) + seconds
+
+    def record_artifact(self, kind, path):
+        """Count the bytes of an artifact file, e.g. a trace or a video"""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        self.artifact_bytes[kind] = self.artifact_bytes.get(kind, 0) + size
+
+    def pytest_runtest_logreport(self, report):
+        self.record_phase(report.nodeid, "test_body" if report.when == "call" else report.when, report.duration)
+        outcome = self._pending.get(report.nodeid)
+        if report.outcome == "rerun":
+            outcome = "rerun"
+        elif report.failed and outcome != "rerun":
+            outcome = "failed" if report.when == "call" else "error"
+        elif report.skipped and outcome is None:
+            outcome = "skipped"
+        self._pending[report.nodeid] = outcome
+
+        if report.when != "teardown":
+            return
+        outcome = self._pending.pop(report.nodeid) or "passed"
+        if outcome == "rerun":
+            self.retries += 1
+            return
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        if self.stream:
+            self.write()
+
+    def duration(self):
+        return (self.finished or time.time()) - self.started
+
+    def to_dict(self):
+        return {
+            "started": self.started,
+            "duration": self.duration(),
+            "counters": {
+                "tests": self.outcomes,
+                "retries": self.retries,
+                "artifact_bytes": self.artifact_bytes,
+            },
+            "startup_phases": self.startup_phases,
+            "tests": self.tests,
+        }
+
+    def to_openmetrics(self):
+        """
+        Format the metrics in the OpenMetrics text format
+
+        Returns:
+            str: Exposition ending with "# EOF"
+        """
+        lines = [
+            f"# TYPE {PREFIX}_session_duration_seconds gauge",
+            f"{PREFIX}_session_duration_seconds {self.duration():.3f}",
+            f"# TYPE {PREFIX}_tests counter",
+            f"# HELP {PREFIX}_tests Tests by final outcome",
+        ]
+        lines += [f"{PREFIX}_tests_total{_labels(outcome=outcome)} {count}" for outcome, count in sorted(self.outcomes.items())]
+        lines += [
+            f"# TYPE {PREFIX}_retries counter",
+            f"{PREFIX}_retries_total {self.retries}",
+            f"# TYPE {PREFIX}_artifact_bytes counter",
+            f"# UNIT {PREFIX}_artifact_bytes bytes",
+        ]
+        lines += [f"{PREFIX}_artifact_bytes_total{_labels(kind=kind)} {size}" for kind, size in sorted(self.artifact_bytes.items())]
+        lines += [f"# TYPE {PREFIX}_startup_phase_seconds gauge", f"# UNIT {PREFIX}_startup_phase_seconds seconds"]
+        lines += [
+            f"{PREFIX}_startup_phase_seconds{_labels(phase=phase)} {seconds:.6f}"
+            for phase, seconds in self.startup_phases.items()
+        ]
+        lines += [
+            f"# TYPE {PREFIX}_test_phase_seconds gauge",
+            f"# UNIT {PREFIX}_test_phase_seconds seconds",
+            f"# HELP {PREFIX}_test_phase_seconds Time spent per test and phase",
+        ]
+        for nodeid, phases in sorted(self.tests.items()):
+            lines += [
+                f"{PREFIX}_test_phase_seconds{_labels(test=nodeid, phase=phase)} {seconds:.6f}"
+                for phase, seconds in phases.items()
+            ]
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """Write <output_dir>/run-metrics.json and run-metrics.prom, replacing them atomically"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        for suffix, content in ((".json", json.dumps(self.to_dict(), indent=2)), (".prom", self.to_openmetrics())):
+            path = os.path.join(self.output_dir, self.file_stem + suffix)
+            with open(path + ".tmp", "w", encoding="utf-8") as file:
+                file.write(content)
+            os.replace(path + ".tmp", path)
+
+    def pytest_sessionfinish(self, session):
+        try:
+            self.write()
+        except OSError as e:
+            logger.error(f"Failed to write run metrics: {e}")
+
+    def pytest_terminal_summary(self, terminalreporter):
+        path = os.path.abspath(os.path.join(self.output_dir, self.file_stem))
+        terminalreporter.write_sep("-", f"Run metrics: {path}.prom, {path}.json")
@@ -0,0 +1,386 @@
+"""
+Scenario runner module executing recorded step lists with redundant browser commands removed
+
+A scenario is a CSV (or YAML) list of steps with an action, a locator and a value:
+
+    action,locator,value
+    goto,,https://your-app-url.com
+    click,label:First Name,
+    fill,label:First Name,{first_name}
+    click,role:button:Apply,
+
+Locators are written as kind:argument with kind one of css, text, label,
+placeholder, testid or role (role:name:accessible name); a double-quoted
+argument matches exactly, like Playwright's exact=True. {placeholders} in values
+are filled from the test data row; other braces are kept as recorded.
+
+Usage:
+    python -m utils.scenario_runner convert recorded_script.py data/scenarios/recorded.csv
+    python -m utils.scenario_runner plan data/scenarios/bridger.csv
+"""
+import argparse
+import ast
+import csv
+import logging
+import os
+import re
+
+import allure
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+ACTIONS = {"goto", "click", "dblclick", "fill", "press", "check", "uncheck", "select", "hover", "focus"}
+
+# Actions only giving the element focus, which fill does by itself
+FOCUS_ACTIONS = {"click", "dblclick", "focus"}
+
+# Actions whose repetition on the same element leaves the page as a single one does
+IDEMPOTENT_ACTIONS = {"check", "uncheck", "select", "hover", "focus"}
+
+# Locator kinds that can be resolved inside the page to fill several fields in one call
+BATCHABLE_KINDS = {"css", "label", "placeholder", "testid"}
+
+GET_BY_KINDS = {
+    "get_by_text": "text",
+    "get_by_label": "label",
+    "get_by_placeholder": "placeholder",
+    "get_by_test_id": "testid",
+    "get_by_role": "role",
+    "locator": "css",
+}
+
+BATCH_FILL_SCRIPT = """
+fields => {
+    const normalize = text => (text || "").replace(/\\s+/g, " ").trim();
+    const matches = (text, field) => field.exact
+        ? normalize(text) === field.argument
+        : normalize(text).toLowerCase().includes(field.argument.toLowerCase());
+    const candidates = field => {
+        if (field.kind === "css") return [...document.querySelectorAll(field.argument)];
+        if (field.kind === "testid") return [...document.querySelectorAll(`[data-testid="${CSS.escape(field.argument)}"]`)];
+        if (field.kind === "placeholder") {
+            return [...document.querySelectorAll("[placeholder]")].filter(e => matches(e.placeholder, field));
+        }
+        const labelled = [...document.querySelectorAll("label")]
+            .filter(e => e.control && matches(e.textContent, field)).map(e => e.control);
+        const named = [...document.querySelectorAll("[aria-label]")].filter(e => matches(e.getAttribute("aria-label"), field));
+        return [...new Set([...labelled, ...named])];
+    };
+    // Like Playwright's strict mode, a locator matching several elements is left to the locator itself
+    const find = field => {
+        const found = candidates(field);
+        return found.length === 1 ? found[0] : null;
+    };
+    const elements = fields.map(find);
+    const fillable = e => e && (e instanceof HTMLInputElement || e instanceof HTMLTextAreaElement)
+        && !e.disabled && !e.readOnly && e.getClientRects().length > 0;
+    if (!elements.every(fillable)) return false;
+    elements.forEach((element, index) => {
+        // The native setter keeps frameworks that track the value property in sync
+        const prototype = Object.getPrototypeOf(element);
+        Object.getOwnPropertyDescriptor(prototype, "value").set.call(element, fields[index].value);
+        element.dispatchEvent(new Event("input", {bubbles: true}));
+        element.dispatchEvent(new Event("change", {bubbles: true}));
+    });
+    return true;
+}
+"""
+
+
+def fill_placeholders(value, data):
+    """
+    Replace the {name} placeholders of a step value that the data has a value for
+
+    Args:
+        value: Recorded value, e.g. "{first_name}" or '{"json": true}'
+        data: Test data row
+
+    Returns:
+        str: Value with the known placeholders filled in
+    """
+    return PLACEHOLDER.sub(lambda match: str(data[match.group(1)]) if match.group(1) in data else match.group(0), value)
+
+
+def parse_locator(locator):
+    """
+    Split a locator spec into its kind, argument and exactness
+
+    Args:
+        locator: e.g. 'label:First Name', 'text:"Search"' or 'role:link:"test"'
+
+    Returns:
+        dict: {"kind": str, "argument": str, "role": str or None, "exact": bool}
+    """
+    kind, _, argument = locator.partition(":")
+    role = None
+    if kind == "role":
+        role, _, argument = argument.partition(":")
+    exact = len(argument) >= 2 and argument.startswith('"') and argument.endswith('"')
+    return {"kind": kind, "argument": argument[1:-1] if exact else argument, "role": role, "exact": exact}
+
+
+def load_scenario(file_path):
+    """
+    Load the steps of a scenario file
+
+    Args:
+        file_path: .csv, .yaml or .yml scenario
+
+    Returns:
+        list[dict]: Steps with action, locator and value
+    """
+    if file_path.endswith((".yaml", ".yml")):
+        # PyYAML is only needed for YAML scenarios
+        import yaml
+        with open(file_path, "r", encoding="utf-8") as file:
+            rows = yaml.safe_load(file) or []
+    else:
+        with open(file_path, mode="r", newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+
+    steps = []
+    for number, row in enumerate(rows, start=1):
+        action = (row.get("action") or "").strip()
+        if action not in ACTIONS:
+            raise ValueError(f"{file_path} step {number}: unknown action '{action}'")
+        steps.append({
+            "action": action,
+            "locator": (row.get("locator") or "").strip(),
+            "value": "" if row.get("value") is None else str(row["value"]),
+        })
+    return steps
+
+
+def optimize_steps(steps, batch_fills=True):
+    """
+    Remove browser commands that do not change the outcome of a scenario
+
+    - click, dblclick and focus on a field right before filling it are dropped, fill focuses the field itself
+    - consecutive actions on the same locator are merged: a fill replaces the previous fill,
+      a repeated check, uncheck, select, hover or focus replaces the previous one
+    - consecutive fills of fields that can be found inside the page are grouped into one batch step
+
+    Args:
+        steps: Steps as returned by load_scenario
+        batch_fills: Group independent fills
+
+    Returns:
+        list[dict]: Optimized steps, batches have action "fill_batch" and the grouped fills in "steps"
+    """
+    optimized = []
+    for step in steps:
+        previous = optimized[-1] if optimized else None
+        if step["action"] == "fill":
+            while optimized and optimized[-1]["locator"] == step["locator"] and optimized[-1]["action"] in FOCUS_ACTIONS | {"fill"}:
+                optimized.pop()
+        elif previous and previous["locator"] == step["locator"] and step["action"] in IDEMPOTENT_ACTIONS:
+            if previous["action"] == step["action"] or {previous["action"], step["action"]} == {"check", "uncheck"}:
+                optimized.pop()
+        optimized.append(step)
+
+    if not batch_fills:
+        return optimized
+
+    batched = []
+    batch = []
+    for step in optimized + [None]:
+        if step and step["action"] == "fill" and parse_locator(step["locator"])["kind"] in BATCHABLE_KINDS:
+            batch.append(step)
+            continue
+        if len(batch) > 1:
+            batched.append({"action": "fill_batch", "locator": "", "value": "", "steps": batch})
+        else:
+            batched.extend(batch)
+        batch = []
+        if step:
+            batched.append(step)
+    return batched
+
+
+def format_plan(steps, optimized):
+    """Describe an optimized scenario next to the number of recorded steps"""
+    lines = []
+    for step in optimized:
+        if step["action"] == "fill_batch":
+            lines.append(f"fill_batch  {', '.join(fill['locator'] for fill in step['steps'])}")
+        else:
+            lines.append(f"{step['action']:<11} {step['locator']} {step['value']}".rstrip())
+    lines.append(f"{len(steps)} recorded steps -> {len(optimized)} optimized steps")
+    return "\n".join(lines)
+
+
+class ScenarioRunner:
+    """Runs scenario steps on a Playwright page"""
+
+    def __init__(self, page, optimize=True, batch_fills=True):
+        """
+        Args:
+            page: Playwright page
+            optimize: Remove redundant steps before running
+            batch_fills: Fill independent fields with one in-page call
+        """
+        self.page = page
+        self.optimize = optimize
+        self.batch_fills = batch_fills
+        self.commands = 0
+
+    def locator(self, spec):
+        """Build the Playwright locator of a locator spec"""
+        locator = parse_locator(spec)
+        kind, argument, exact = locator["kind"], locator["argument"], locator["exact"]
+        if kind == "css":
+            return self.page.locator(argument)
+        if kind == "text":
+            return self.page.get_by_text(argument, exact=exact)
+        if kind == "label":
+            return self.page.get_by_label(argument, exact=exact)
+        if kind == "placeholder":
+            return self.page.get_by_placeholder(argument, exact=exact)
+        if kind == "testid":
+            return self.page.get_by_test_id(argument)
+        if kind == "role":
+            return self.page.get_by_role(locator["role"], name=argument or None, exact=exact)
+        raise ValueError(f"Unknown locator kind in '{spec}'")
+
+    def run(self, steps, data=None):
+        """
+        Run a scenario
+
+        Args:
+            steps: Steps as returned by load_scenario
+            data: Values for the {placeholders} of the steps
+
+        Returns:
+            int: Browser commands sent
+        """
+        data = data or {}
+        steps = [{**step, "value": fill_placeholders(step["value"], data)} for step in steps]
+        planned = optimize_steps(steps, self.batch_fills) if self.optimize else steps
+        self.commands = 0
+        for step in planned:
+            if step["action"] == "fill_batch":
+                self._fill_batch(step["steps"])
+            else:
+                self._run_step(step)
+        logger.info(f"Scenario ran {len(steps)} recorded steps with {self.commands} browser commands")
+        return self.commands
+
+    def _run_step(self, step):
+        action, spec, value = step["action"], step["locator"], step["value"]
+        with allure.step(f"{action} {spec} {value}".rstrip()):
+            self.commands += 1
+            if action == "goto":
+                self.page.goto(value)
+                return
+            locator = self.locator(spec)
+            if action == "fill":
+                locator.fill(value)
+            elif action == "press":
+                locator.press(value)
+            elif action == "select":
+                locator.select_option(value)
+            else:
+                getattr(locator, action)()
+
+    def _fill_batch(self, fills):
+        with allure.step(f"Fill {', '.join(fill['locator'] for fill in fills)}"):
+            # Auto-wait once, for the first field, before filling all of them in the page
+            self.commands += 2
+            self.locator(fills[0]["locator"]).wait_for()
+            fields = [{**parse_locator(fill["locator"]), "value": fill["value"]} for fill in fills]
+            if self.page.evaluate(BATCH_FILL_SCRIPT, fields):
+                return
+            logger.info("Batch fill could not resolve every field, filling them one by one")
+            for fill in fills:
+                self._run_step(fill)
+
+
+def _literal(node):
+    """Value of a recorded argument: a constant, or a data["key"] lookup written as {key}"""
+    if isinstance(node, ast.Constant):
+        return str(node.value)
+    if isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Constant):
+        return f"{{{node.slice.value}}}"
+    raise ValueError(f"Unsupported argument: {ast.unparse(node)}")
+
+
+def convert_script(file_path):
+    """
+    Convert a recorded Playwright script (codegen output) into scenario steps
+
+    Args:
+        file_path: Python file with page.get_by_...(...).action(...) lines
+
+    Returns:
+        list[dict]: Steps with action, locator and value
+    """
+    with open(file_path, "r", encoding="utf-8") as file:
+        tree = ast.parse(file.read())
+
+    calls = sorted(
+        (node.value for node in ast.walk(tree) if isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)),
+        key=lambda call: call.lineno,
+    )
+    steps = []
+    for call in calls:
+        if not isinstance(call.func, ast.Attribute):
+            continue
+        action = "select" if call.func.attr == "select_option" else call.func.attr
+        target = call.func.value
+        if action == "goto" and isinstance(target, ast.Name) and target.id == "page":
+            steps.append({"action": "goto", "locator": "", "value": _literal(call.args[0])})
+            continue
+        if action not in ACTIONS or not (isinstance(target, ast.Call) and isinstance(target.func, ast.Attribute)):
+            continue
+        kind = GET_BY_KINDS.get(target.func.attr)
+        if kind is None or not (isinstance(target.func.value, ast.Name) and target.func.value.id == "page"):
+            continue
+
+        keywords = {keyword.arg: keyword.value for keyword in target.keywords}
+        exact = isinstance(keywords.get("exact"), ast.Constant) and keywords["exact"].value is True
+        if kind == "role":
+            name = _literal(keywords["name"]) if "name" in keywords else ""
+            argument = f"{_literal(target.args[0])}:" + (f'"{name}"' if exact else name)
+        else:
+            argument = _literal(target.args[0])
+            argument = f'"{argument}"' if exact else argument
+        steps.append({
+            "action": action,
+            "locator": f"{kind}:{argument}",
+            "value": _literal(call.args[0]) if call.args else "",
+        })
+    return steps
+
+
+def write_scenario(steps, file_path):
+    """Write scenario steps to a CSV file"""
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    with open(file_path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=["action", "locator", "value"])
+        writer.writeheader()
+        writer.writerows(steps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert recorded scripts to scenarios and show their optimized steps")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="Convert a recorded Playwright script into a CSV scenario")
+    convert.add_argument("script")
+    convert.add_argument("scenario")
+    plan = commands.add_parser("plan", help="Print the optimized steps of a scenario")
+    plan.add_argument("scenario")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        steps = convert_script(args.script)
+        write_scenario(steps, args.scenario)
+        print(f"Wrote {len(steps)} steps to {args.scenario}")
+    else:
+        steps = load_scenario(args.scenario)
+        print(format_plan(steps, optimize_steps(steps)))
+
+
+if __name__ == "__main__":
+    main()
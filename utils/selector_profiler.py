@@ -0,0 +1,286 @@
+"""
+Selector profiler module measuring how fast page object selectors resolve and suggesting faster equivalents
+
+Usage:
+    python -m utils.selector_profiler [--runs 20] [--headless true] [--report selector-report.json]
+"""
+import argparse
+import configparser
+import json
+import logging
+import re
+import statistics
+import time
+
+from playwright.sync_api import sync_playwright
+
+from base.navigation import load_page_classes
+from data.user_credentials import valid_user
+from pages.create_lead_page import CreateLeadPage
+from pages.find_leads_page import FindLeadsPage
+from pages.home_page import HomePage
+from pages.leads_page import LeadsPage
+from pages.login_page import LoginPage
+from pages.my_home_page import MyHomePage
+from pages.view_lead_page import ViewLeadPage
+from utils.browser_factory import get_launch_settings
+from utils.trace_analyzer import percentile
+
+logger = logging.getLogger(__name__)
+
+XPATH_STEP = re.compile(r"(//|/)(\w+|\*)((?:\[[^\]]+\])*)")
+XPATH_PREDICATE = re.compile(r"\[([^\]]+)\]")
+XPATH_POSITIONAL = re.compile(r"^\((.+)\)\[(\d+)\]$")
+
+
+def collect_selectors():
+    """
+    Collect the selector constants of every page object class in the pages package
+
+    Returns:
+        dict: {"ClassName.CONSTANT": selector}
+    """
+    selectors = {}
+    for class_name, cls in load_page_classes().items():
+        for name, value in vars(cls).items():
+            if name.isupper() and isinstance(value, str) and not name.endswith("URL"):
+                selectors[f"{class_name}.{name}"] = value
+    return selectors
+
+
+def _translate_predicate(predicate):
+    predicate = predicate.strip()
+    match = re.fullmatch(r"@([\w-]+)='([^']*)'", predicate)
+    if match:
+        return f"[{match.group(1)}='{match.group(2)}']"
+    match = re.fullmatch(r"text\(\)='([^']*)'", predicate)
+    if match:
+        return f':text-is("{match.group(1)}")'
+    match = re.fullmatch(r"contains\(text\(\),\s*'([^']*)'\)", predicate)
+    if match:
+        return f':has-text("{match.group(1)}")'
+    match = re.fullmatch(r"contains\(@([\w-]+),\s*'([^']*)'\)", predicate)
+    if match:
+        return f"[{match.group(1)}*='{match.group(2)}']"
+    return None
+
+
+def xpath_to_css(selector):
+    """
+    Translate a simple XPath into an equivalent Playwright CSS selector
+
+    Supports //tag and /tag steps with @attr='value', text()='value',
+    contains(text(),'value') and contains(@attr,'value') predicates, and a
+    positional (xpath)[n] wrapper.
+
+    Args:
+        selector: XPath selector
+
+    Returns:
+        str: CSS selector, or None if the XPath cannot be translated
+    """
+    positional = XPATH_POSITIONAL.match(selector)
+    if positional:
+        inner = xpath_to_css(positional.group(1))
+        return f"{inner} >> nth={int(positional.group(2)) - 1}" if inner else None
+
+    if not selector.startswith("/"):
+        return None
+    parts = []
+    position = 0
+    for step in XPATH_STEP.finditer(selector):
+        if step.start() != position:
+            return None
+        position = step.end()
+        axis, tag, predicates = step.groups()
+        css = "" if tag == "*" else tag
+        for predicate in XPATH_PREDICATE.findall(predicates):
+            translated = _translate_predicate(predicate)
+            if translated is None:
+                return None
+            css += translated
+        if parts:
+            parts.append(" > " if axis == "/" else " ")
+        parts.append(css or "*")
+    if position != len(selector):
+        return None
+    return "".join(parts)
+
+
+class SelectorProfiler:
+    """Measures selector resolution time in a live page and verifies faster candidates"""
+
+    def __init__(self, page, runs=20):
+        """
+        Args:
+            page: Playwright page showing the application
+            runs: Number of resolutions measured per selector
+        """
+        self.page = page
+        self.runs = runs
+        self.results = {}
+
+    def measure(self, selector):
+        """
+        Resolve a selector repeatedly
+
+        Returns:
+            dict: {"count": matches, "median_ms": float, "p95_ms": float}
+        """
+        locator = self.page.locator(selector)
+        timings = []
+        count = 0
+        for _ in range(self.runs):
+            start = time.perf_counter()
+            count = locator.count()
+            timings.append((time.perf_counter() - start) * 1000)
+        return {
+            "count": count,
+            "median_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+        }
+
+    def same_elements(self, selector, candidate):
+        """Check that two selectors match exactly the same elements in the same order"""
+        try:
+            expected = self.page.locator(selector).element_handles()
+            actual = self.page.locator(candidate).element_handles()
+        except Exception:
+            return False
+        if not expected or len(expected) != len(actual):
+            return False
+        return all(
+            self.page.evaluate("([a, b]) => a === b", [first, second])
+            for first, second in zip(expected, actual)
+        )
+
+    def candidates(self, selector):
+        """
+        Build faster candidate selectors from the XPath and the matched element
+
+        Returns:
+            list[str]: Candidate selectors, not yet verified
+        """
+        candidates = []
+        translated = xpath_to_css(selector)
+        if translated and translated != selector:
+            candidates.append(translated)
+
+        handle = self.page.locator(selector).first.element_handle()
+        attributes = handle.evaluate(
+            "e => ({tag: e.tagName.toLowerCase(), id: e.id, name: e.getAttribute('name')})"
+        )
+        if attributes["id"]:
+            candidates.append(f"#{attributes['id']}")
+        if attributes["name"]:
+            candidates.append(f"{attributes['tag']}[name='{attributes['name']}']")
+        return [candidate for candidate in dict.fromkeys(candidates) if candidate != selector]
+
+    def profile(self, name, selector):
+        """
+        Profile one selector constant and look for a verified faster equivalent
+
+        Args:
+            name: Constant name, e.g. "FindLeadsPage.FIND_LEADS_BUTTON"
+            selector: Selector value
+
+        Returns:
+            dict: Measurement, or None if the selector matches nothing on this page
+        """
+        original = self.measure(selector)
+        if not original["count"]:
+            return None
+
+        result = {"selector": selector, **original, "suggestion": None}
+        for candidate in self.candidates(selector):
+            if not self.same_elements(selector, candidate):
+                continue
+            timing = self.measure(candidate)
+            best = result["suggestion"]["median_ms"] if result["suggestion"] else original["median_ms"]
+            if timing["median_ms"] < best * 0.9:
+                result["suggestion"] = {"selector": candidate, "median_ms": timing["median_ms"]}
+        self.results[name] = result
+        return result
+
+    def profile_page_object(self, cls, selectors):
+        """Profile the selectors of one page object class on the current page"""
+        prefix = f"{cls.__name__}."
+        for name, selector in selectors.items():
+            if name.startswith(prefix) and name not in self.results:
+                self.profile(name, selector)
+
+    def format_report(self, selectors):
+        """Format the measurements as a table, listing selectors never found last"""
+        lines = [f"{'Selector':<42}{'median ms':>10}  {'suggestion':<45}{'median ms':>10}"]
+        for name, result in self.results.items():
+            suggestion = result["suggestion"] or {"selector": "-", "median_ms": ""}
+            lines.append(
+                f"{name:<42}{result['median_ms']:>10}  {suggestion['selector'][:44]:<45}{suggestion['median_ms']:>10}"
+            )
+        missing = [name for name in selectors if name not in self.results]
+        if missing:
+            lines += ["", f"Not found on any visited page: {', '.join(missing)}"]
+        return "\n".join(lines)
+
+
+def walk_and_profile(page, profiler, selectors):
+    """Walk the CRM flow with the page objects and profile each page on the way"""
+    login_page = LoginPage(page)
+    login_page.navigate_to_login()
+    login_page.perform_login("invalid", "invalid")
+    profiler.profile_page_object(LoginPage, selectors)
+
+    login_page.navigate_to_login()
+    login_page.perform_login(valid_user["username"], valid_user["password"])
+    profiler.profile_page_object(HomePage, selectors)
+
+    HomePage(page).click_crm_sfa_link()
+    profiler.profile_page_object(MyHomePage, selectors)
+
+    MyHomePage(page).click_leads_tab()
+    profiler.profile_page_object(LeadsPage, selectors)
+
+    LeadsPage(page).click_create_lead()
+    profiler.profile_page_object(CreateLeadPage, selectors)
+
+    MyHomePage(page).click_leads_tab()
+    LeadsPage(page).click_find_leads()
+    find_leads_page = FindLeadsPage(page)
+    find_leads_page.click_find_leads()
+    profiler.profile_page_object(FindLeadsPage, selectors)
+
+    find_leads_page.click_first_result()
+    profiler.profile_page_object(ViewLeadPage, selectors)
+
+
+def main():
+    config = configparser.ConfigParser()
+    config.read("config.properties")
+
+    parser = argparse.ArgumentParser(description="Profile page object selectors against the live application")
+    parser.add_argument("--runs", type=int, default=20, help="Resolutions measured per selector")
+    parser.add_argument("--headless", default="true")
+    parser.add_argument("--browser", default=config.get("default", "browser", fallback="chromium"))
+    parser.add_argument("--report", default="selector-report.json")
+    args = parser.parse_args()
+
+    selectors = collect_selectors()
+    with sync_playwright() as playwright:
+        browser_type, launch_args, context_args = get_launch_settings(
+            playwright, args.browser.lower(), {"headless": args.headless.lower() == "true"}, {}
+        )
+        browser = browser_type.launch(**launch_args)
+        page = browser.new_context(**context_args).new_page()
+        profiler = SelectorProfiler(page, args.runs)
+        try:
+            walk_and_profile(page, profiler, selectors)
+        finally:
+            browser.close()
+
+    with open(args.report, "w", encoding="utf-8") as file:
+        json.dump(profiler.results, file, indent=2)
+    print(profiler.format_report(selectors))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Sharding module splitting the suite across CI nodes by historical duration and merging the nodes' results
+
+Usage:
+    python -m pytest tests/ --shard=2/4
+    python -m utils.sharding merge shard-1 shard-2 shard-3 shard-4 --output merged [--base cache]
+"""
+import argparse
+import configparser
+import glob
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import zlib
+
+from utils.run_metrics import RunMetrics
+from utils.streaming_report import StreamingReport
+from utils.trace_analyzer import percentile
+
+logger = logging.getLogger(__name__)
+
+
+def parse_shard(value):
+    """
+    Parse a shard option
+
+    Args:
+        value: "i/n", e.g. "2/4" for the second of four shards
+
+    Returns:
+        tuple: (index, count), index counted from 1
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", value or "")
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise ValueError(f"Invalid shard '{value}', expected i/n with 1 <= i <= n")
+    return int(match.group(1)), int(match.group(2))
+
+
+def assign_shards(nodeids, durations, count):
+    """
+    Split tests into shards of about the same total duration
+
+    Tests with a recorded duration are spread longest first onto the least loaded
+    shard, then tests without history (estimated at the median duration) in the
+    order of a hash of their node id. Adding tests never moves the tests with
+    history, and every node computes the same split from the same durations file.
+
+    Args:
+        nodeids: Collected test node ids
+        durations: Recorded seconds per node id
+        count: Number of shards
+
+    Returns:
+        tuple: ({nodeid: shard index from 0}, [estimated seconds per shard])
+    """
+    known = sorted((nodeid for nodeid in set(nodeids) if nodeid in durations), key=lambda nodeid: (-durations[nodeid], nodeid))
+    unknown = sorted((nodeid for nodeid in set(nodeids) if nodeid not in durations), key=lambda nodeid: (zlib.crc32(nodeid.encode("utf-8")), nodeid))
+    default = percentile([durations[nodeid] for nodeid in known], 50) or 1.0
+    assignment = {}
+    loads = [0.0] * count
+    for nodeid in known + unknown:
+        shard = min(range(count), key=lambda index: (loads[index], index))
+        assignment[nodeid] = shard
+        loads[shard] += durations.get(nodeid, default)
+    return assignment, loads
+
+
+class TestDurations:
+    """Pytest plugin recording the duration of every test, setup and teardown included, across runs"""
+
+    # Not a test class
+    __test__ = False
+
+    def __init__(self, file_path, smoothing=0.5):
+        """
+        Args:
+            file_path: JSON file keeping the durations
+            smoothing: Weight of the latest run in the moving average
+        """
+        self.file_path = file_path
+        self.smoothing = smoothing
+        self.data = _load_json(file_path)
+        self._run = {}
+
+    def durations(self):
+        """Recorded seconds per node id"""
+        return {nodeid: entry["duration"] for nodeid, entry in self.data.items()}
+
+    def pytest_runtest_logreport(self, report):
+        self._run[report.nodeid] = self._run.get(report.nodeid, 0) + report.duration
+
+    def pytest_sessionfinish(self, session):
+        if not self._run:
+            return
+        now = time.time()
+        updated = {}
+        for nodeid, seconds in self._run.items():
+            previous = self.data.get(nodeid, {}).get("duration")
+            if previous is not None:
+                seconds = self.smoothing * seconds + (1 - self.smoothing) * previous
+            updated[nodeid] = {"duration": round(seconds, 3), "updated": now}
+        # Parallel workers update the same file with their own tests
+        self.data = {**_load_json(self.file_path), **updated}
+        try:
+            _write_json(self.file_path, self.data)
+        except OSError as e:
+            logger.error(f"Failed to save test durations: {e}")
+
+
+def _load_json(path):
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable {path}: {e}")
+        return {}
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+
+
+def _new_samples(samples, base):
+    """Samples appended to a copy of base, which may have been trimmed at the front since"""
+    for kept in range(min(len(samples), len(base)), 0, -1):
+        if samples[:kept] == base[len(base) - kept:]:
+            return samples[kept:]
+    return samples
+
+
+def merge_durations(shards):
+    """The entry of every test from the shard that ran it last"""
+    merged = {}
+    for data in shards:
+        for nodeid, entry in data.items():
+            if nodeid not in merged or entry.get("updated", 0) > merged[nodeid].get("updated", 0):
+                merged[nodeid] = entry
+    return merged
+
+
+def merge_samples(shards, base, max_samples=200):
+    """
+    Merge histories of {group: {key: [samples]}} (latency and page performance histories)
+
+    Every shard started from base and appended its own samples, so the merge is
+    base plus the new samples of each shard, trimmed to max_samples.
+    Without a base the longest list of each key is kept.
+    """
+    merged = {}
+    for group in sorted({group for data in shards for group in data}):
+        for key in sorted({key for data in shards for key in data.get(group, {})}):
+            lists = [data[group][key] for data in shards if key in data.get(group, {})]
+            if base is None:
+                merged.setdefault(group, {})[key] = max(lists, key=len)
+                continue
+            base_samples = base.get(group, {}).get(key, [])
+            samples = list(base_samples)
+            for shard_samples in lists:
+                samples += _new_samples(shard_samples, base_samples)
+            merged.setdefault(group, {})[key] = samples[-max_samples:]
+    return merged
+
+
+def merge_counts(shards, base):
+    """
+    Merge histories of {nodeid: {counter: n}} (flaky test history)
+
+    Adds the runs each shard counted on top of base; without a base the entry with the most runs is kept.
+    """
+    merged = {}
+    for nodeid in sorted({nodeid for data in shards for nodeid in data}):
+        entries = [data[nodeid] for data in shards if nodeid in data]
+        if base is None:
+            merged[nodeid] = max(entries, key=lambda entry: entry.get("runs", 0))
+            continue
+        start = base.get(nodeid, {})
+        merged[nodeid] = {
+            counter: start.get(counter, 0) + sum(entry.get(counter, 0) - start.get(counter, 0) for entry in entries)
+            for counter in sorted({counter for entry in entries for counter in entry})
+        }
+    return merged
+
+
+def merge_files(shard_dirs, output_dir):
+    """Hardlink or copy the files of every shard's directory, keeping the first of equal names (Allure names its files by uuid)"""
+    os.makedirs(output_dir, exist_ok=True)
+    copied = 0
+    for shard_dir in shard_dirs:
+        if not os.path.isdir(shard_dir):
+            continue
+        for name in os.listdir(shard_dir):
+            target = os.path.join(output_dir, name)
+            if os.path.exists(target) or not os.path.isfile(os.path.join(shard_dir, name)):
+                continue
+            try:
+                os.link(os.path.join(shard_dir, name), target)
+            except OSError:
+                shutil.copy2(os.path.join(shard_dir, name), target)
+            copied += 1
+    return copied
+
+
+def _read_calls(path, function):
+    prefix = f"{function}("
+    calls = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line.startswith(prefix) and line.endswith(");"):
+                calls.append(json.loads(line[len(prefix):-2]))
+    return calls
+
+
+def merge_reports(shard_dirs, output_dir, page_size=200):
+    """Re-page the results of every shard's streaming report into one report"""
+    results, started = [], []
+    for shard_dir in shard_dirs:
+        data_dir = os.path.join(shard_dir, "data")
+        if not os.path.isdir(data_dir):
+            continue
+        for path in sorted(glob.glob(os.path.join(data_dir, "page-*.js"))):
+            results += _read_calls(path, "reportResult")
+        summary_path = os.path.join(data_dir, "summary.js")
+        if os.path.exists(summary_path):
+            started += [summary["started"] for summary in _read_calls(summary_path, "reportSummary")]
+
+    report = StreamingReport(output_dir, page_size)
+    if started:
+        report.started = min(started)
+    for result in results:
+        report.append_result(result)
+    report.pytest_sessionfinish(None)
+    return len(results)
+
+
+def merge_metrics(shard_dirs, output_dir):
+    """Sum the counters and collect the test phases of every shard's (and xdist worker's) run metrics"""
+    metrics = RunMetrics(output_dir)
+    runs = [
+        _load_json(path)
+        for shard_dir in shard_dirs
+        for path in sorted(glob.glob(os.path.join(shard_dir, "run-metrics*.json")))
+    ]
+    if not runs:
+        return 0
+    for run in runs:
+        counters = run.get("counters", {})
+        for outcome, count in counters.get("tests", {}).items():
+            metrics.outcomes[outcome] = metrics.outcomes.get(outcome, 0) + count
+        metrics.retries += counters.get("retries", 0)
+        for kind, size in counters.get("artifact_bytes", {}).items():
+            metrics.artifact_bytes[kind] = metrics.artifact_bytes.get(kind, 0) + size
+        # The nodes start in parallel, the slowest start is the one the run waited for
+        for phase, seconds in run.get("startup_phases", {}).items():
+            metrics.startup_phases[phase] = max(seconds, metrics.startup_phases.get(phase, 0))
+        for nodeid, phases in run.get("tests", {}).items():
+            for phase, seconds in phases.items():
+                metrics.record_phase(nodeid, phase, seconds)
+    metrics.started = min(run["started"] for run in runs)
+    metrics.finished = max(run["started"] + run["duration"] for run in runs)
+    metrics.write()
+    return len(runs)
+
+
+def merge(shard_dirs, output_dir, paths, base_dir=None, page_size=200):
+    """
+    Combine the results of the shards into one result set laid out like a single run
+
+    Args:
+        shard_dirs: Directories holding each node's results, laid out like the repository
+        output_dir: Directory the merged results are written to
+        paths: Relative paths of the results: allure_results, report_dir, metrics_dir,
+            durations, latency_history, perf_history, flaky_history and artifact_dirs
+        base_dir: Directory with the histories the nodes started from, to add up their samples exactly
+        page_size: Results per page of the merged streaming report
+
+    Returns:
+        dict: Number of merged items per kind
+    """
+    summary = {
+        "allure_results": merge_files(
+            [os.path.join(shard, paths["allure_results"]) for shard in shard_dirs],
+            os.path.join(output_dir, paths["allure_results"]),
+        ),
+        "report_results": merge_reports(
+            [os.path.join(shard, paths["report_dir"]) for shard in shard_dirs],
+            os.path.join(output_dir, paths["report_dir"]),
+            page_size,
+        ),
+        "metrics_files": merge_metrics(
+            [os.path.join(shard, paths["metrics_dir"]) for shard in shard_dirs],
+            os.path.join(output_dir, paths["metrics_dir"]),
+        ),
+    }
+
+    def histories(name):
+        return [_load_json(os.path.join(shard, paths[name])) for shard in shard_dirs]
+
+    def base(name):
+        return _load_json(os.path.join(base_dir, paths[name])) if base_dir else None
+
+    merged_histories = {
+        "durations": merge_durations(histories("durations")),
+        "latency_history": merge_samples(histories("latency_history"), base("latency_history")),
+        "perf_history": merge_samples(histories("perf_history"), base("perf_history")),
+        "flaky_history": merge_counts(histories("flaky_history"), base("flaky_history")),
+    }
+    for name, data in merged_histories.items():
+        if data:
+            _write_json(os.path.join(output_dir, paths[name]), data)
+            summary[name] = len(data)
+
+    # Traces, screenshots and videos keep the paths the report links to
+    for artifact_dir in paths["artifact_dirs"]:
+        summary[artifact_dir] = merge_files(
+            [os.path.join(shard, artifact_dir) for shard in shard_dirs],
+            os.path.join(output_dir, artifact_dir),
+        )
+    return summary
+
+
+def main():
+    config = configparser.ConfigParser()
+    config.read("config.properties")
+
+    def setting(key, fallback):
+        return config.get("default", key, fallback=fallback) or fallback
+
+    parser = argparse.ArgumentParser(description="Merge the results of test shards run on several nodes")
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser("merge")
+    command.add_argument("shards", nargs="+", help="Result directory of each shard")
+    command.add_argument("--output", required=True, help="Directory of the merged results")
+    command.add_argument("--base", help="Directory with the histories the shards started from")
+    command.add_argument("--allure_results", default="allure-results")
+    command.add_argument("--report_dir", default=setting("report.dir", "report"))
+    command.add_argument("--metrics_dir", default=setting("metrics.dir", "metrics"))
+    command.add_argument("--artifact_dirs", nargs="*", default=[setting("trace.dir", "traces"), "screenshots", "videos"])
+    args = parser.parse_args()
+
+    paths = {
+        "allure_results": args.allure_results,
+        "report_dir": args.report_dir,
+        "metrics_dir": args.metrics_dir,
+        "durations": setting("shard.durations", ".test_durations.json"),
+        "latency_history": setting("timeout.history", ".latency_history.json"),
+        "perf_history": setting("perf.history", ".perf_history.json"),
+        "flaky_history": setting("retry.history", ".flaky_history.json"),
+        "artifact_dirs": args.artifact_dirs,
+    }
+    page_size = config.getint("default", "report.page_size", fallback=200)
+    summary = merge(args.shards, args.output, paths, args.base, page_size)
+    for name, count in summary.items():
+        print(f"{name:<20}{count:>8}")
+
+
+if __name__ == "__main__":
+    main()
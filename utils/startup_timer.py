@@ -0,0 +1,43 @@
+"""
+Startup timer module measuring the phases of a test session start
+"""
+import time
+
+
+class StartupTimer:
+    """Collects the durations of startup phases in the order they finish"""
+
+    def __init__(self, origin=None):
+        """
+        Args:
+            origin: perf_counter value the session start is measured from (default: now)
+        """
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.phases = {}
+        self._starts = {}
+
+    def start(self, phase):
+        """Mark the start of a phase"""
+        self._starts[phase] = time.perf_counter()
+
+    def stop(self, phase):
+        """Mark the end of a phase started with start()"""
+        if phase in self._starts:
+            self.record(phase, time.perf_counter() - self._starts.pop(phase))
+
+    def record(self, phase, seconds):
+        """Record the duration of a phase measured elsewhere"""
+        self.phases.setdefault(phase, seconds)
+
+    def mark(self, phase):
+        """Record the time elapsed since the origin, once"""
+        self.record(phase, time.perf_counter() - self.origin)
+
+    def report_lines(self):
+        """
+        Format the recorded phases for the terminal
+
+        Returns:
+            list[str]: One line per phase
+        """
+        return [f"{phase:<32}{seconds * 1000:>10.0f} ms" for phase, seconds in self.phases.items()]
@@ -0,0 +1,263 @@
+"""
+Streaming report module writing test results to an HTML report as they finish
+"""
+import json
+import logging
+import os
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Prefix of the user_properties that link an artifact to a test, e.g. ("artifact:Playwright Trace", path)
+ARTIFACT_PREFIX = "artifact:"
+
+MAX_LONGREPR = 50000
+
+VIEWER_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Test Report</title>
+<style>
+body { font-family: Arial, sans-serif; margin: 20px; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border: 1px solid #ddd; padding: 6px; text-align: left; vertical-align: top; }
+tr.result { cursor: pointer; }
+.passed { color: #2e7d32; } .failed, .error { color: #c62828; }
+.skipped, .xfailed, .xpassed { color: #757575; } .rerun { color: #ef6c00; }
+pre { white-space: pre-wrap; background: #f7f7f7; padding: 8px; max-height: 400px; overflow: auto; }
+#pager button { margin-right: 4px; }
+</style>
+</head>
+<body>
+<h1>Test Report</h1>
+<p id="summary">Loading...</p>
+<p>Filter: <select id="filter"><option value="">all</option></select></p>
+<div id="pager"></div>
+<table>
+<thead><tr><th>#</th><th>Result</th><th>Test</th><th>Duration (s)</th><th>Artifacts</th></tr></thead>
+<tbody id="results"></tbody>
+</table>
+<script>
+var summary = null;
+var rows = [];
+var currentPage = 0;
+
+function reportSummary(data) {
+  summary = data;
+  var counts = Object.keys(data.outcomes).map(function (key) { return data.outcomes[key] + " " + key; });
+  document.getElementById("summary").textContent =
+    data.total + " results (" + counts.join(", ") + "), started " + data.started + (data.finished ? ", finished " + data.finished : ", running");
+  var filter = document.getElementById("filter");
+  Object.keys(data.outcomes).forEach(function (key) {
+    if (!filter.querySelector("option[value='" + key + "']")) {
+      var option = document.createElement("option");
+      option.value = option.textContent = key;
+      filter.appendChild(option);
+    }
+  });
+  var pager = document.getElementById("pager");
+  pager.innerHTML = "";
+  for (var page = 1; page <= data.pages; page++) {
+    var button = document.createElement("button");
+    button.textContent = page;
+    button.onclick = loadPage.bind(null, page);
+    pager.appendChild(button);
+  }
+}
+
+function reportResult(result) {
+  rows.push(result);
+}
+
+function loadPage(page) {
+  // Only one page of results is kept in memory at a time
+  currentPage = page;
+  rows = [];
+  var old = document.getElementById("page-script");
+  if (old) { old.remove(); }
+  var script = document.createElement("script");
+  script.id = "page-script";
+  script.src = "data/page-" + String(page).padStart(5, "0") + ".js?" + Date.now();
+  script.onload = render;
+  document.body.appendChild(script);
+}
+
+function render() {
+  var filter = document.getElementById("filter").value;
+  var body = document.getElementById("results");
+  body.innerHTML = "";
+  rows.forEach(function (result) {
+    if (filter && result.outcome !== filter) { return; }
+    var row = document.createElement("tr");
+    row.className = "result";
+    var name = result.attempt ? result.nodeid + " (attempt " + result.attempt + ")" : result.nodeid;
+    [result.index, result.outcome, name, result.duration.toFixed(2)].forEach(function (value, column) {
+      var cell = document.createElement("td");
+      cell.textContent = value;
+      if (column === 1) { cell.className = result.outcome; }
+      row.appendChild(cell);
+    });
+    var links = document.createElement("td");
+    result.artifacts.forEach(function (artifact) {
+      var link = document.createElement("a");
+      link.href = artifact.path;
+      link.textContent = artifact.name;
+      link.target = "_blank";
+      links.appendChild(link);
+      links.appendChild(document.createElement("br"));
+    });
+    row.appendChild(links);
+    body.appendChild(row);
+    if (result.longrepr) {
+      var detail = document.createElement("tr");
+      var cell = document.createElement("td");
+      cell.colSpan = 5;
+      cell.style.display = "none";
+      var pre = document.createElement("pre");
+      pre.textContent = result.longrepr;
+      cell.appendChild(pre);
+      detail.appendChild(cell);
+      body.appendChild(detail);
+      row.onclick = function () { cell.style.display = cell.style.display === "none" ? "" : "none"; };
+    }
+  });
+}
+
+document.getElementById("filter").onchange = render;
+</script>
+<script src="data/summary.js"></script>
+<script>if (summary && summary.pages) { loadPage(1); }</script>
+</body>
+</html>
+"""
+
+
+class StreamingReport:
+    """Pytest plugin appending each test result to paged script files read by a static viewer"""
+
+    def __init__(self, report_dir, page_size=200):
+        """
+        Args:
+            report_dir: Directory the viewer and result pages are written to
+            page_size: Number of results per page file
+        """
+        self.report_dir = report_dir
+        self.data_dir = os.path.join(report_dir, "data")
+        self.page_size = page_size
+        self.total = 0
+        self.outcomes = {}
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self._pending = {}
+        # {nodeid: attempts written}, {nodeid: user_properties already linked}
+        self._attempts = {}
+        self._linked = {}
+        self._page_file = None
+        self._page = 0
+
+    def _start(self):
+        """Replace the previous report, once there is a first result, so runs without tests keep it"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        for name in os.listdir(self.data_dir):
+            if name.startswith("page-") or name == "summary.js":
+                os.remove(os.path.join(self.data_dir, name))
+        with open(os.path.join(self.report_dir, "index.html"), "w", encoding="utf-8") as file:
+            file.write(VIEWER_HTML)
+
+    def pytest_runtest_logreport(self, report):
+        pending = self._pending.setdefault(report.nodeid, {"outcome": None, "duration": 0.0, "longrepr": ""})
+        pending["duration"] += report.duration
+        outcome = self._outcome(report)
+        if outcome and (pending["outcome"] in (None, "passed") or outcome == "rerun"):
+            pending["outcome"] = outcome
+        if report.failed and report.longrepr:
+            pending["longrepr"] += str(report.longrepr)[:MAX_LONGREPR]
+
+        if report.when == "teardown":
+            self._write_result(report, self._pending.pop(report.nodeid))
+
+    @staticmethod
+    def _outcome(report):
+        if report.outcome == "rerun":
+            return "rerun"
+        if hasattr(report, "wasxfail"):
+            return "xfailed" if report.skipped else "xpassed"
+        if report.failed:
+            return "failed" if report.when == "call" else "error"
+        if report.skipped:
+            return "skipped"
+        if report.when == "call":
+            return "passed"
+        return None
+
+    def _write_result(self, report, pending):
+        # Retried tests keep their user_properties, each attempt links only the artifacts it added
+        linked = self._linked.get(report.nodeid, 0)
+        self._linked[report.nodeid] = len(report.user_properties)
+        artifacts = [
+            {"name": name[len(ARTIFACT_PREFIX):], "path": os.path.relpath(path, self.report_dir).replace(os.sep, "/")}
+            for name, path in report.user_properties[linked:]
+            if name.startswith(ARTIFACT_PREFIX) and path and os.path.exists(path)
+        ]
+        outcome = pending["outcome"] or "passed"
+        attempt = self._attempts.get(report.nodeid, 0) + 1
+        if outcome == "rerun":
+            self._attempts[report.nodeid] = attempt
+        else:
+            self._attempts.pop(report.nodeid, None)
+            self._linked.pop(report.nodeid, None)
+        self.append_result({
+            "nodeid": report.nodeid,
+            "outcome": outcome,
+            # Only the attempts of retried tests are numbered
+            "attempt": attempt if outcome == "rerun" or attempt > 1 else None,
+            "duration": pending["duration"],
+            "longrepr": pending["longrepr"],
+            "artifacts": artifacts,
+        })
+
+    def append_result(self, result):
+        """Append a result to the current page file, also used to merge the reports of several runs"""
+        if not self._page:
+            self._start()
+        if self._page_file is None or self.total % self.page_size == 0:
+            self._open_next_page()
+
+        self.total += 1
+        self.outcomes[result["outcome"]] = self.outcomes.get(result["outcome"], 0) + 1
+        result = {"index": self.total, **{key: value for key, value in result.items() if key != "index"}}
+        self._page_file.write(f"reportResult({json.dumps(result)});\n")
+        self._page_file.flush()
+        self._write_summary(finished=False)
+
+    def _open_next_page(self):
+        if self._page_file:
+            self._page_file.close()
+        self._page += 1
+        self._page_file = open(os.path.join(self.data_dir, f"page-{self._page:05d}.js"), "w", encoding="utf-8")
+
+    def _write_summary(self, finished):
+        summary = {
+            "total": self.total,
+            "pages": self._page,
+            "outcomes": self.outcomes,
+            "started": self.started,
+            "finished": datetime.now().isoformat(timespec="seconds") if finished else None,
+        }
+        path = os.path.join(self.data_dir, "summary.js")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            file.write(f"reportSummary({json.dumps(summary)});\n")
+        os.replace(f"{path}.tmp", path)
+
+    def pytest_sessionfinish(self, session):
+        if not self._page:
+            return
+        if self._page_file:
+            self._page_file.close()
+            self._page_file = None
+        self._write_summary(finished=True)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self._page:
+            return
+        terminalreporter.write_sep("-", f"Streaming report: {os.path.abspath(os.path.join(self.report_dir, 'index.html'))}")
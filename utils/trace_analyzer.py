@@ -0,0 +1,336 @@
+"""
+Trace analyzer module mining Playwright trace zips for slow actions and network timings
+
+Usage:
+    python -m utils.trace_analyzer [--trace_dir traces] [--history trace-history.json] [--top 10]
+"""
+import argparse
+import configparser
+import io
+import json
+import logging
+import math
+import os
+import zipfile
+from datetime import datetime
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of a list of numbers
+
+    Args:
+        values: Numbers to rank
+        pct: Percentile between 0 and 100
+
+    Returns:
+        float: Percentile value, 0 for an empty list
+    """
+    if not values:
+        return 0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def iter_trace_events(zip_path, suffix):
+    """
+    Stream the JSON events of a trace archive without extracting it
+
+    Args:
+        zip_path: Path to the trace zip
+        suffix: Entry suffix, ".trace" for actions or ".network" for network events
+
+    Yields:
+        dict: One trace event
+    """
+    with zipfile.ZipFile(zip_path) as archive:
+        for name in archive.namelist():
+            if not name.endswith(suffix):
+                continue
+            with archive.open(name) as raw:
+                for line in io.TextIOWrapper(raw, encoding="utf-8"):
+                    if line.strip():
+                        yield json.loads(line)
+
+
+def read_actions(zip_path):
+    """
+    Read the API calls recorded in a trace
+
+    Returns:
+        list[dict]: Actions with api, selector, duration, wait time (ms) and error flag
+    """
+    calls = {}
+    for event in iter_trace_events(zip_path, ".trace"):
+        event_type = event.get("type")
+        if event_type == "before":
+            calls[event["callId"]] = {
+                "api": event.get("apiName") or f"{event.get('class')}.{event.get('method')}",
+                "method": event.get("method", ""),
+                "selector": (event.get("params") or {}).get("selector"),
+                "start": event.get("startTime", 0),
+            }
+        elif event_type == "log" and event.get("callId") in calls:
+            call = calls[event["callId"]]
+            call["last_log"] = event.get("time")
+            if "ready" not in call and event.get("message", "").strip().startswith("element is "):
+                # "element is visible, enabled and stable": actionability checks passed
+                call["ready"] = event.get("time")
+        elif event_type == "input" and event.get("callId") in calls:
+            # Input events carry no timestamp, the log line before them marks when input started
+            call = calls[event["callId"]]
+            call["ready"] = call.get("last_log", call.get("ready"))
+        elif event_type == "after" and event.get("callId") in calls:
+            calls[event["callId"]]["end"] = event.get("endTime")
+            calls[event["callId"]]["error"] = bool(event.get("error"))
+        elif event_type == "action":
+            # Traces written before per-event recording keep the whole call in one entry
+            metadata = event.get("metadata", {})
+            calls[metadata.get("id", len(calls))] = {
+                "api": metadata.get("apiName") or f"{metadata.get('type')}.{metadata.get('method')}",
+                "method": metadata.get("method", ""),
+                "selector": (metadata.get("params") or {}).get("selector"),
+                "start": metadata.get("startTime", 0),
+                "end": metadata.get("endTime"),
+                "error": bool(metadata.get("error")),
+            }
+
+    actions = []
+    for call in calls.values():
+        if call.get("end") is None:
+            continue
+        duration = call["end"] - call["start"]
+        if call.get("ready") is not None:
+            # Time until the element was actionable is spent in auto-waiting
+            wait = call["ready"] - call["start"]
+        elif "wait" in call["method"].lower():
+            wait = duration
+        else:
+            wait = 0
+        actions.append({
+            "api": call["api"],
+            "selector": call["selector"],
+            "duration": duration,
+            "wait": max(0, wait),
+            "error": call.get("error", False),
+        })
+    return actions
+
+
+def read_requests(zip_path):
+    """
+    Read the network requests recorded in a trace
+
+    Returns:
+        list[dict]: Requests with url (without query), method, status, time (ms), size and timings
+    """
+    requests = []
+    for event in iter_trace_events(zip_path, ".network"):
+        if event.get("type") != "resource-snapshot":
+            continue
+        entry = event.get("snapshot", {})
+        request = entry.get("request", {})
+        response = entry.get("response", {})
+        url = urlsplit(request.get("url", ""))
+        requests.append({
+            "url": f"{url.scheme}://{url.netloc}{url.path}",
+            "method": request.get("method"),
+            "status": response.get("status"),
+            "time": entry.get("time") or 0,
+            "size": max(0, (response.get("content") or {}).get("size") or 0),
+            "timings": {key: value for key, value in (entry.get("timings") or {}).items() if value and value > 0},
+        })
+    return requests
+
+
+class TraceAnalyzer:
+    """Aggregates action and network timings over trace archives and across runs"""
+
+    def __init__(self, trace_dir, history_path, top=10):
+        """
+        Args:
+            trace_dir: Directory with the trace zips written by the page fixture
+            history_path: JSON file keeping analyzed archives and per-run summaries
+            top: Number of entries in the slowest lists
+        """
+        self.trace_dir = trace_dir
+        self.history_path = history_path
+        self.top = top
+        self.history = self._load_history()
+
+    def _load_history(self):
+        if os.path.exists(self.history_path):
+            with open(self.history_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        return {"analyzed": [], "runs": []}
+
+    def new_archives(self):
+        """Get the trace zips not analyzed by a previous run"""
+        if not os.path.isdir(self.trace_dir):
+            return []
+        analyzed = set(self.history["analyzed"])
+        return sorted(
+            os.path.join(self.trace_dir, name)
+            for name in os.listdir(self.trace_dir)
+            if name.endswith(".zip") and name not in analyzed
+        )
+
+    def analyze(self, archives):
+        """
+        Aggregate the actions and requests of a set of trace archives
+
+        Args:
+            archives: Paths of trace zips
+
+        Returns:
+            dict: Run summary
+        """
+        by_api = {}
+        by_selector = {}
+        by_url = {}
+        phases = {}
+        total_wait = 0
+        total_action_time = 0
+        errors = 0
+        request_count = 0
+        request_bytes = 0
+        analyzed = []
+
+        for archive in archives:
+            try:
+                actions = read_actions(archive)
+                requests = read_requests(archive)
+            except (zipfile.BadZipFile, ValueError, KeyError) as e:
+                logger.warning(f"Skipping unreadable trace {archive}: {e}")
+                continue
+            analyzed.append(os.path.basename(archive))
+
+            for action in actions:
+                by_api.setdefault(action["api"], []).append(action["duration"])
+                if action["selector"]:
+                    by_selector.setdefault(action["selector"], []).append(action["duration"])
+                total_wait += action["wait"]
+                total_action_time += action["duration"]
+                errors += action["error"]
+
+            for request in requests:
+                by_url.setdefault(request["url"], []).append(request["time"])
+                request_count += 1
+                request_bytes += request["size"]
+                for phase, value in request["timings"].items():
+                    phases[phase] = phases.get(phase, 0) + value
+
+        def stats(values):
+            return {
+                "count": len(values),
+                "mean": round(sum(values) / len(values), 1),
+                "p95": round(percentile(values, 95), 1),
+                "max": round(max(values), 1),
+            }
+
+        def slowest(groups):
+            ranked = sorted(groups.items(), key=lambda item: sum(item[1]) / len(item[1]), reverse=True)
+            return {key: stats(values) for key, values in ranked[:self.top]}
+
+        return {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "archives": analyzed,
+            "actions": {
+                "count": sum(len(values) for values in by_api.values()),
+                "total_ms": round(total_action_time),
+                "auto_wait_ms": round(total_wait),
+                "errors": errors,
+                "by_api": {api: stats(values) for api, values in sorted(by_api.items())},
+                "slowest_selectors": slowest(by_selector),
+            },
+            "network": {
+                "requests": request_count,
+                "bytes": request_bytes,
+                "time_by_phase_ms": {phase: round(value) for phase, value in phases.items()},
+                "slowest_urls": slowest(by_url),
+            },
+        }
+
+    def run(self):
+        """
+        Analyze the new trace archives and store the run in the history
+
+        Returns:
+            dict: Run summary, or None when there was no new readable archive
+        """
+        archives = self.new_archives()
+        if not archives:
+            return None
+        summary = self.analyze(archives)
+        analyzed = summary.pop("archives")
+        if not analyzed:
+            return None
+        self.history["analyzed"].extend(analyzed)
+        # Unreadable archives were skipped and are not part of the run
+        summary["traces"] = len(analyzed)
+        self.history["runs"].append(summary)
+        with open(self.history_path, "w", encoding="utf-8") as file:
+            json.dump(self.history, file, indent=2)
+        return summary
+
+    def format_report(self, runs=5):
+        """
+        Format the latest run and the trend of the previous runs
+
+        Args:
+            runs: Number of runs shown in the trend table
+
+        Returns:
+            str: Report text
+        """
+        if not self.history["runs"]:
+            return "No trace runs analyzed yet"
+        latest = self.history["runs"][-1]
+        lines = [f"Trace analytics for {latest['traces']} trace(s), {latest['date']}", ""]
+
+        lines.append(f"{'Action':<40}{'count':>7}{'mean':>10}{'p95':>10}{'max':>10}")
+        for api, stat in latest["actions"]["by_api"].items():
+            lines.append(f"{api:<40}{stat['count']:>7}{stat['mean']:>10}{stat['p95']:>10}{stat['max']:>10}")
+
+        lines += ["", f"{'Slowest selectors (ms)':<70}{'mean':>10}{'p95':>10}"]
+        for selector, stat in latest["actions"]["slowest_selectors"].items():
+            lines.append(f"{selector[:69]:<70}{stat['mean']:>10}{stat['p95']:>10}")
+
+        lines += ["", f"{'Slowest URLs (ms)':<70}{'mean':>10}{'p95':>10}"]
+        for url, stat in latest["network"]["slowest_urls"].items():
+            lines.append(f"{url[:69]:<70}{stat['mean']:>10}{stat['p95']:>10}")
+
+        phases = ", ".join(f"{phase} {value} ms" for phase, value in latest["network"]["time_by_phase_ms"].items())
+        lines += ["", f"Network: {latest['network']['requests']} requests, {latest['network']['bytes']} bytes ({phases})"]
+
+        lines += ["", f"{'Run':<22}{'traces':>8}{'actions':>9}{'action ms':>12}{'auto-wait ms':>14}{'requests':>10}"]
+        for run in self.history["runs"][-runs:]:
+            lines.append(
+                f"{run['date']:<22}{run['traces']:>8}{run['actions']['count']:>9}"
+                f"{run['actions']['total_ms']:>12}{run['actions']['auto_wait_ms']:>14}{run['network']['requests']:>10}"
+            )
+        return "\n".join(lines)
+
+
+def main():
+    config = configparser.ConfigParser()
+    config.read("config.properties")
+
+    parser = argparse.ArgumentParser(description="Summarize Playwright traces written by the test run")
+    parser.add_argument("--trace_dir", default=config.get("default", "trace.dir", fallback="traces"))
+    parser.add_argument("--history", default=config.get("default", "trace.history", fallback="trace-history.json"))
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest selectors and URLs to show")
+    args = parser.parse_args()
+
+    analyzer = TraceAnalyzer(args.trace_dir, args.history, args.top)
+    if analyzer.run() is None:
+        print(f"No new traces in {args.trace_dir}")
+    print(analyzer.format_report())
+
+
+if __name__ == "__main__":
+    main()
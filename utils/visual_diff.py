@@ -0,0 +1,167 @@
+"""
+Visual diff module comparing screenshots with NumPy, after a perceptual hash pre-check
+"""
+import io
+import logging
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Largest possible YIQ color distance between two pixels
+MAX_YIQ_DELTA = 35215.0
+
+HASH_SIZE = 8
+
+
+def decode_png(data):
+    """
+    Decode PNG bytes into an RGBA array
+
+    Four channels let every pixel be compared as a single 32-bit word.
+
+    Returns:
+        numpy.ndarray: Height x width x 4 uint8 array
+    """
+    return np.ascontiguousarray(Image.open(io.BytesIO(data)).convert("RGBA"))
+
+
+def encode_png(image):
+    """Encode an RGB or RGBA array as PNG bytes"""
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def perceptual_hash(image):
+    """
+    Difference hash of an image: one bit per horizontally adjacent pair of pixels
+    of a 9x8 grayscale thumbnail, set when the left one is brighter
+
+    Returns:
+        int: 64-bit hash
+    """
+    # Subsample before resizing, the hash only looks at the coarse layout
+    step_y = max(1, image.shape[0] // (HASH_SIZE * 8))
+    step_x = max(1, image.shape[1] // (HASH_SIZE * 8))
+    sample = np.ascontiguousarray(image[::step_y, ::step_x, :3])
+    thumbnail = np.asarray(
+        Image.fromarray(sample).convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.BILINEAR),
+        dtype=np.int16,
+    )
+    bits = (thumbnail[:, :-1] > thumbnail[:, 1:]).flatten()
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def hash_distance(first, second):
+    """Number of differing bits between two perceptual hashes"""
+    return bin(first ^ second).count("1")
+
+
+def region_mask(shape, regions):
+    """
+    Build a boolean mask of the pixels to ignore
+
+    Args:
+        shape: (height, width) of the image
+        regions: (x, y, width, height) rectangles in image pixels
+
+    Returns:
+        numpy.ndarray: Height x width bool array, True for ignored pixels
+    """
+    mask = np.zeros(shape, dtype=bool)
+    height, width = shape
+    for x, y, region_width, region_height in regions:
+        left, top = max(0, int(x)), max(0, int(y))
+        right, bottom = min(width, int(np.ceil(x + region_width))), min(height, int(np.ceil(y + region_height)))
+        if right > left and bottom > top:
+            mask[top:bottom, left:right] = True
+    return mask
+
+
+def _yiq_delta(expected, actual):
+    """Squared perceptual color distance of pixel pairs (pixelmatch's YIQ metric)"""
+    difference = expected.astype(np.float32) - actual.astype(np.float32)
+    red, green, blue = difference[:, 0], difference[:, 1], difference[:, 2]
+    y = red * 0.29889531 + green * 0.58662247 + blue * 0.11448223
+    i = red * 0.59597799 - green * 0.27417610 - blue * 0.32180189
+    q = red * 0.21147017 - green * 0.52261711 + blue * 0.31114694
+    return 0.5053 * y * y + 0.299 * i * i + 0.1957 * q * q
+
+
+def diff_image(expected, different, mask):
+    """
+    Render a diff: the baseline faded to gray, differing pixels in red and masked regions in blue
+
+    Returns:
+        numpy.ndarray: RGB array
+    """
+    channels = expected.astype(np.uint16)
+    gray = (channels[..., 0] * 77 + channels[..., 1] * 150 + channels[..., 2] * 29) >> 8
+    faded = (230 + gray // 10).astype(np.uint8)
+    image = np.repeat(faded[..., None], 3, axis=2)
+    image[mask] = (200, 220, 255)
+    image[different] = (255, 0, 0)
+    return image
+
+
+def compare_images(expected, actual, regions=(), threshold=0.1, max_diff_ratio=0.001, max_hash_distance=10):
+    """
+    Compare a screenshot with its baseline
+
+    Identical pixels pass without further work, a perceptual hash distance above
+    max_hash_distance fails without counting pixels, anything in between is
+    decided by the share of pixels whose color distance exceeds the threshold.
+
+    Args:
+        expected: Baseline RGBA array
+        actual: New capture RGBA array
+        regions: (x, y, width, height) rectangles of dynamic content to ignore
+        threshold: Per-pixel color distance tolerance between 0 and 1
+        max_diff_ratio: Share of differing pixels still accepted
+        max_hash_distance: Perceptual hash bits allowed to differ before the pixel diff
+
+    Returns:
+        dict: {"match": bool, "reason": str, "diff_pixels": int, "diff_ratio": float,
+               "hash_distance": int, "diff_image": RGB array or None}
+    """
+    result = {"match": True, "reason": "", "diff_pixels": 0, "diff_ratio": 0.0, "hash_distance": 0, "diff_image": None}
+    if expected.shape != actual.shape:
+        result.update(
+            match=False,
+            reason=f"size {actual.shape[1]}x{actual.shape[0]} differs from baseline {expected.shape[1]}x{expected.shape[0]}",
+        )
+        return result
+
+    mask = region_mask(expected.shape[:2], regions)
+    # Only pixels whose 32-bit value changed need the color distance
+    different = expected.view(np.uint32)[..., 0] != actual.view(np.uint32)[..., 0]
+    different[mask] = False
+    if not different.any():
+        return result
+
+    if mask.any():
+        # Masked pixels are taken from the baseline so they do not change the hash
+        actual = actual.copy()
+        actual[mask] = expected[mask]
+    result["hash_distance"] = hash_distance(perceptual_hash(expected), perceptual_hash(actual))
+    if result["hash_distance"] > max_hash_distance:
+        # The diff image shows every changed pixel, their color distance is never computed
+        result.update(
+            match=False,
+            reason=f"perceptual hash differs by {result['hash_distance']} bits",
+            diff_image=diff_image(expected, different, mask),
+        )
+        return result
+
+    different[different] = _yiq_delta(expected[different], actual[different]) > MAX_YIQ_DELTA * threshold * threshold
+    result["diff_pixels"] = int(np.count_nonzero(different))
+    result["diff_ratio"] = result["diff_pixels"] / different.size
+    if result["diff_ratio"] > max_diff_ratio:
+        result.update(
+            match=False,
+            reason=f"{result['diff_pixels']} pixels ({result['diff_ratio']:.2%}) differ",
+            diff_image=diff_image(expected, different, mask),
+        )
+    return result